@@ -79,9 +79,27 @@ logging.getLogger("spacy").setLevel(logging.WARNING)
 class Settings(AWSSettings, DBSettings, LoggingSettings):
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY")
+    OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 100))
     REDIS_URL = os.getenv("REDIS_URL")
     PDF_PROCESSING_TIMEOUT = int(os.getenv("PDF_PROCESSING_TIMEOUT", 600))
+    PDF_CACHE_TTL = int(os.getenv("PDF_CACHE_TTL", 86400))
+    S3_UPLOAD_CACHE_TTL = int(os.getenv("S3_UPLOAD_CACHE_TTL", 86400))
+    CLASSIFICATION_CACHE_TTL = int(os.getenv("CLASSIFICATION_CACHE_TTL", 86400))
+    CLASSIFICATION_BATCH_SIZE = int(os.getenv("CLASSIFICATION_BATCH_SIZE", 8))
+    # Roughly 3000 tokens at ~4 characters per token
+    QUESTION_KEYWORD_CHAR_BUDGET = int(os.getenv("QUESTION_KEYWORD_CHAR_BUDGET", 12000))
+    # Split the cores between the FastAPI workers (gunicorn -w, mirrored in WEB_CONCURRENCY)
+    TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", 4)))))
+    TEXTRACT_POLL_BASE = float(os.getenv("TEXTRACT_POLL_BASE", 0.5))
+    TEXTRACT_POLL_MAX = float(os.getenv("TEXTRACT_POLL_MAX", 30))
+    TEXTRACT_MAX_POOL_CONNECTIONS = int(os.getenv("TEXTRACT_MAX_POOL_CONNECTIONS", 50))
+    TEXTRACT_MAX_ATTEMPTS = int(os.getenv("TEXTRACT_MAX_ATTEMPTS", 10))
+    TEXTRACT_TASK_RATE_LIMIT = os.getenv("TEXTRACT_TASK_RATE_LIMIT", "2/s")
+    TEXTRACT_START_TPS = float(os.getenv("TEXTRACT_START_TPS", 2))
+    TEXTRACT_GET_TPS = float(os.getenv("TEXTRACT_GET_TPS", 5))
     BEARER_TOKEN = os.getenv("API_TOKEN")
+    USE_TESSEROCR = os.getenv("USE_TESSEROCR", "false").lower() == "true"
+    TESSEROCR_POOL_SIZE = int(os.getenv("TESSEROCR_POOL_SIZE", os.cpu_count() or 1))
 
 # Helper function to get the base URL
 def get_base_url(url: str) -> str:
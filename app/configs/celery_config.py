@@ -1,10 +1,21 @@
 # /app/configs/celery_config.py
 
 import time
+import orjson
 import threading
 from celery import Celery
+from kombu.serialization import register
 from app.config import logger, settings
 
+# Register orjson as a Celery serializer; bounding box payloads are large and orjson encodes them much faster than json
+register(
+    'orjson',
+    orjson.dumps,
+    orjson.loads,
+    content_type='application/x-orjson',
+    content_encoding='binary'
+)
+
 # Initialize the Celery application
 app = Celery('doc_analyse_tasks',
              broker= settings.REDIS_URL,
@@ -21,16 +32,24 @@ app.autodiscover_tasks(['app.tasks'])
 
 # Configure Celery settings
 app.conf.update(
-    task_serializer='json',                         # Use JSON to serialize task arguments and results.
-    accept_content=['json'],                        # Accept only JSON format for content.
-    result_serializer='json',                       # Serialize task results as JSON.
+    task_serializer='orjson',                       # Use orjson to serialize task arguments.
+    accept_content=['orjson', 'json'],              # Accept orjson, and JSON from producers not yet switched over.
+    result_serializer='orjson',                     # Serialize task results with orjson.
+    task_compression='gzip',                        # Compress task messages; bounding box payloads are large.
+    result_compression='gzip',                      # Compress results stored in the backend as well.
     timezone='America/New_York',                    # Set timezone to US Eastern Time (ET).
     enable_utc=True,                                # Enable UTC, ensuring consistency across different regions.
     broker_connection_retry_on_startup=True,        # Retry connecting to the broker if it fails at startup.
     worker_log_level='INFO',                        # Set logging level to INFO for detailed logs.
     task_acks_late=True,                            # Acknowledge tasks after execution to prevent data loss if a worker crashes.
     worker_max_tasks_per_child=100,                 # Recycle workers after 100 tasks to prevent memory leaks.
-    worker_prefetch_multiplier=1                    # Prevent overloading a single worker by balancing task distribution.
+    worker_prefetch_multiplier=1,                   # Prevent overloading a single worker by balancing task distribution.
+    task_routes={                                   # Keep slow OCR jobs from blocking text-layer extraction.
+        'app.services.document_processors.pdf.textract.*': {'queue': 'pdf_ocr'},
+        'app.services.document_processors.pdf.tesseract.*': {'queue': 'pdf_ocr'},
+        'app.services.document_processors.pdf.muPDF.*': {'queue': 'pdf_text'},
+        'app.services.document_processors.pdf.pdf_miner.*': {'queue': 'pdf_text'},
+    }
 )
 
 stop_event = threading.Event()
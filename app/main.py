@@ -8,6 +8,8 @@ from app.routers import questions
 from app.routers.extract import openai, claude
 from app.dependencies import verify_token
 from app.config import logger, init_db
+from app.services.document_processors.pdf.textract import close_textract_client
+from app.services.llm_clients.openai import close_session as close_openai_session
 
 app = FastAPI()
 
@@ -38,3 +40,11 @@ async def universal_exception_handler(request, exc):
 async def startup_event():
     init_db()
     logger.info("Database initialized and collections checked")
+
+# Close long-lived clients on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_textract_client()
+    logger.info("Textract client closed")
+    await close_openai_session()
+    logger.info("OpenAI HTTP session closed")
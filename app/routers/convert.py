@@ -46,6 +46,7 @@ async def convert_files(request: Request, files: List[UploadFile] = File(...)):
         HTTPException: If there's an error during the file processing.
     """
     responses = []
+    pending = []
     # segments_all: List[Segment] = []
     # entities_all: List[Entity] = []
     # topics_all: List[Topic] = []
@@ -85,43 +86,56 @@ async def convert_files(request: Request, files: List[UploadFile] = File(...)):
                 logger.error(f"Unsupported file type: {file.filename}")
                 continue
 
-            result = {
-                "document_id": None,
-                "classification": {},
-            }
-            result.update(await wait_for_celery_task(task.id, settings.PDF_PROCESSING_TIMEOUT))
-
-            # # Prepare document data and segments
-            # document_id = await insert_documents(file.filename, result["text"])
-            # logger.info(f"Inserted document with ID: {document_id} into the database")
-
-            # segments: List[Segment] = await document_segmenter.segment_document(result, content_type)
-            # segments_all.extend(segments)
-
-            # # Perform Entity Recognition on the extracted text
-            # entities: List[Entity] = await entity_recognizer.recognize_entities(result["text"])
-            # entities_all.extend(entities)
-
-            # # Classify the document based on its content
-            # classification: Classification = await document_classifier.classify_document(result["text"])
-            # classifications_all.append({
-            #     "document_id": document_id,
-            #     "classification": classification
-            # })
-            # logger.info(f"Classified document with ID: {document_id} as {classification.label}")
-
-            # doc_type = {
-            #     "label": classification.label,
-            #     "score": classification.score
-            # }
-
-            # result["document_id"] = document_id
-            # result["classification"] = doc_type
-            responses.append(result)
+            # Queue every file first and wait for them together below
+            pending.append((file.filename, task))
 
         except Exception as e:
             logger.error(f"Failed to process file {file.filename}: {e}")
 
+    # The Celery tasks run in parallel, so the request takes as long as the slowest file instead of their sum
+    results = await asyncio.gather(
+        *(wait_for_celery_task(task.id, settings.PDF_PROCESSING_TIMEOUT) for _, task in pending),
+        return_exceptions=True
+    )
+    for (file_name, _), file_result in zip(pending, results):
+        if isinstance(file_result, Exception):
+            logger.error(f"Failed to process file {file_name}: {file_result}")
+            continue
+
+        result = {
+            "document_id": None,
+            "classification": {},
+        }
+        result.update(file_result)
+
+        # # Prepare document data and segments
+        # document_id = await insert_documents(file.filename, result["text"])
+        # logger.info(f"Inserted document with ID: {document_id} into the database")
+
+        # segments: List[Segment] = await document_segmenter.segment_document(result, content_type)
+        # segments_all.extend(segments)
+
+        # # Perform Entity Recognition on the extracted text
+        # entities: List[Entity] = await entity_recognizer.recognize_entities(result["text"])
+        # entities_all.extend(entities)
+
+        # # Classify the document based on its content
+        # classification: Classification = await document_classifier.classify_document(result["text"])
+        # classifications_all.append({
+        #     "document_id": document_id,
+        #     "classification": classification
+        # })
+        # logger.info(f"Classified document with ID: {document_id} as {classification.label}")
+
+        # doc_type = {
+        #     "label": classification.label,
+        #     "score": classification.score
+        # }
+
+        # result["document_id"] = document_id
+        # result["classification"] = doc_type
+        responses.append(result)
+
     # After processing all files, insert data into the database
     # if segments_all:
     #     await insert_segments(document_id, segments_all)
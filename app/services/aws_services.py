@@ -4,16 +4,29 @@ This module defines the AWS S3 file upload and download tasks.
 It provides asynchronous functions to upload a file to an AWS S3 bucket and to download a file from an AWS S3 bucket.
 """
 
+import os
 import uuid
+import asyncio
 import aiofiles
 from aiobotocore.session import AioSession
 from botocore.exceptions import BotoCoreError
 from fastapi import HTTPException
 from app.config import settings, logger
+from app.utils.cache_utils import file_digest, cache_get, cache_set
+
+# Shared by every AWS client; creating a session per call re-walks the credential chain and reloads the config files
+SESSION = AioSession()
+
+# Files above the threshold are uploaded in parts of MULTIPART_CHUNK_SIZE (S3 requires at least 5 MiB per part)
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+MULTIPART_CONCURRENCY = 10
 
 async def upload_file_to_s3(file_path):
     """
     Uploads a file to an AWS S3 bucket.
+    Files above MULTIPART_THRESHOLD are sent as a multipart upload with concurrent parts. The S3 key is cached
+    by content digest, so re-submitting a file that was already uploaded skips the upload entirely.
 
     Parameters:
     - file_path: The path to the file to upload.
@@ -25,22 +38,34 @@ async def upload_file_to_s3(file_path):
     - HTTPException: If the file upload fails due to BotoCoreError or any other exception.
     """
     try:
+        digest = await asyncio.to_thread(file_digest, file_path)
+        cache_key = f"s3:upload:{digest}"
+        cached_key = await cache_get(cache_key)
+        if cached_key is not None:
+            logger.info(f"File already uploaded to S3: {file_path} as {cached_key}")
+            return cached_key
+
         # Generate a unique temporary filename
         temp_filename = f"{uuid.uuid4()}_{file_path.split('/')[-1]}"
         logger.info(f"Uploading file to S3: {file_path} as {temp_filename}")  # Log the upload attempt
-        session = AioSession()
-        async with session.create_client('s3',
+        async with SESSION.create_client('s3',
                                         region_name=settings.AWS_REGION,
                                         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                                         aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY) as s3:
             logger.info(f"Uploading file: {file_path} to S3 bucket: {settings.AWS_S3_BUCKET_NAME} as {temp_filename}")
-            # Read the file content
-            async with aiofiles.open(file_path, 'rb') as file:
-                file_content = await file.read()
-            # Upload the file to S3
-            await s3.put_object(Bucket=settings.AWS_S3_BUCKET_NAME, Key=temp_filename, Body=file_content)
+            file_size = os.path.getsize(file_path)
+            if file_size > MULTIPART_THRESHOLD:
+                await multipart_upload(s3, file_path, file_size, temp_filename)
+            else:
+                # Read the file content
+                async with aiofiles.open(file_path, 'rb') as file:
+                    file_content = await file.read()
+                # Upload the file to S3
+                await s3.put_object(Bucket=settings.AWS_S3_BUCKET_NAME, Key=temp_filename, Body=file_content)
             logger.info(f"File uploaded successfully to S3: {temp_filename}")  # Log successful upload
-            return temp_filename
+
+        await cache_set(cache_key, temp_filename, ttl=settings.S3_UPLOAD_CACHE_TTL)
+        return temp_filename
     except BotoCoreError as e:
         logger.error(f"Failed to upload file to S3: {e}")  # Log BotoCoreError
         raise HTTPException(status_code=500, detail="Failed to upload file to S3.")
@@ -48,6 +73,43 @@ async def upload_file_to_s3(file_path):
         logger.error(f"Unexpected error during file upload to S3: {e}")  # Log unexpected errors
         raise HTTPException(status_code=500, detail="Unexpected error during file upload to S3.")
 
+async def multipart_upload(s3, file_path, file_size, key):
+    """
+    Uploads a file to the S3 bucket as a multipart upload, sending up to MULTIPART_CONCURRENCY parts at a time.
+    Each part is read from disk just before it is sent, so at most that many parts are held in memory.
+    The upload is aborted if any part fails, so S3 does not keep the orphaned parts.
+
+    Parameters:
+    - s3: The S3 client.
+    - file_path: The path to the file to upload.
+    - file_size: The size of the file in bytes.
+    - key: The S3 key to upload the file under.
+    """
+    bucket = settings.AWS_S3_BUCKET_NAME
+    upload = await s3.create_multipart_upload(Bucket=bucket, Key=key)
+    upload_id = upload['UploadId']
+    semaphore = asyncio.Semaphore(MULTIPART_CONCURRENCY)
+
+    async def upload_part(part_number, offset):
+        async with semaphore:
+            async with aiofiles.open(file_path, 'rb') as file:
+                await file.seek(offset)
+                body = await file.read(MULTIPART_CHUNK_SIZE)
+            response = await s3.upload_part(Bucket=bucket, Key=key, UploadId=upload_id,
+                                            PartNumber=part_number, Body=body)
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    try:
+        parts = await asyncio.gather(*(
+            upload_part(part_number, offset)
+            for part_number, offset in enumerate(range(0, file_size, MULTIPART_CHUNK_SIZE), start=1)
+        ))
+        await s3.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id,
+                                           MultipartUpload={'Parts': parts})
+    except BaseException:
+        await s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
 async def download_file_from_s3(bucket_name, file_key):
     """
     Downloads a file from an AWS S3 bucket.
@@ -63,9 +125,8 @@ async def download_file_from_s3(bucket_name, file_key):
     - HTTPException: If the file download fails due to BotoCoreError or any other exception.
     """
     logger.info(f"Downloading file from S3: {file_key}")  # Log the download attempt
-    session = AioSession()
     try:
-        async with session.create_client('s3', region_name=settings.AWS_REGION,
+        async with SESSION.create_client('s3', region_name=settings.AWS_REGION,
                                         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                                         aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY) as s3:
             try:
@@ -84,21 +145,54 @@ async def download_file_from_s3(bucket_name, file_key):
         logger.error(f"Failed to create client: {e}")
         raise HTTPException(status_code=500, detail="Failed to create client for S3.")
 
+async def download_file_from_s3_to_path(bucket_name, file_key, dest_path, chunk_size=1024 * 1024):
+    """
+    Downloads a file from an AWS S3 bucket straight to a local path.
+    The body is streamed to disk in chunks, so the file is never held in memory in full.
+
+    Parameters:
+    - bucket_name: The name of the S3 bucket.
+    - file_key: The key of the file in the S3 bucket.
+    - dest_path: The local path to write the file to.
+    - chunk_size: The number of bytes read from the stream at a time.
+
+    Returns:
+    - The destination path.
+
+    Raises:
+    - HTTPException: If the file download fails due to BotoCoreError or any other exception.
+    """
+    logger.info(f"Downloading file from S3: {file_key} to {dest_path}")  # Log the download attempt
+    try:
+        async with SESSION.create_client('s3', region_name=settings.AWS_REGION,
+                                        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                                        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY) as s3:
+            response = await s3.get_object(Bucket=bucket_name, Key=file_key)
+            async with response['Body'] as stream, aiofiles.open(dest_path, 'wb') as file:
+                while chunk := await stream.read(chunk_size):
+                    await file.write(chunk)
+            logger.info(f"File downloaded successfully from S3: {file_key}")  # Log successful download
+            return dest_path
+    except BotoCoreError as e:
+        logger.error(f"Failed to download file from S3: {e}")  # Log BotoCoreError
+        raise HTTPException(status_code=500, detail="Failed to access file from S3.")
+    except Exception as e:
+        logger.error(f"Unexpected error during file download from S3: {e}")  # Log unexpected errors
+        raise HTTPException(status_code=500, detail="Unexpected error during file download from S3.")
+
 # Example usage
 # Note: These calls should be made within an async context
 if __name__ == "__main__":
-    import asyncio
-
     async def main():
         # Example call to upload a file to S3
         file_path = "path/to/your/file"
         uploaded_filename = await upload_file_to_s3(file_path)
         print(f"Uploaded filename: {uploaded_filename}")
 
-        # Example call to download a file from S3
-        downloaded_file = await download_file_from_s3(settings.AWS_S3_BUCKET_NAME, uploaded_filename)
-        with open("path/to/save/downloaded_file", "wb") as file:
-            file.write(downloaded_file)
-        print(f"Downloaded file content: {downloaded_file}")
+        # Example call to download a file from S3 straight to disk
+        downloaded_path = await download_file_from_s3_to_path(
+            settings.AWS_S3_BUCKET_NAME, uploaded_filename, "path/to/save/downloaded_file"
+        )
+        print(f"Downloaded file to: {downloaded_path}")
 
     asyncio.run(main())
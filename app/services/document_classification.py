@@ -6,18 +6,22 @@ This module defines the document classification service for the FastAPI applicat
 from typing import List, Dict, Any
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
-from transformers import BertTokenizer, BertForSequenceClassification, pipeline
+from transformers import BertTokenizerFast, BertForSequenceClassification, pipeline
 import torch
 import gc
 from app.models.rag_model import Classification
-from app.config import logger
+from app.config import settings, logger
+from app.utils.cache_utils import text_digest, cache_get, cache_set
+from app.utils.torch_utils import configure_torch_threads
+
+configure_torch_threads()
 
 class DocumentClassifier:
     """
     A service class for classifying documents using a BERT-based model.
 
     Attributes:
-        tokenizer (BertTokenizer): Tokenizer for text processing.
+        tokenizer (BertTokenizerFast): Tokenizer for text processing.
         model (BertForSequenceClassification): Model for sequence classification.
         device (str): Device to run the model on, either 'cuda' or 'cpu'.
     """
@@ -30,7 +34,7 @@ class DocumentClassifier:
             Exception: If there's an error during initialization.
         """
         try:
-            self.tokenizer = BertTokenizer.from_pretrained("bert-base-uncased")
+            self.tokenizer = BertTokenizerFast.from_pretrained("bert-base-uncased")
             self.model = BertForSequenceClassification.from_pretrained("bert-base-uncased")
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
             self.model.to(self.device)
@@ -63,7 +67,7 @@ class DocumentClassifier:
 
     def classify_chunks(self, text_chunks: List[str]) -> List[Dict[str, Any]]:
         """
-        Classifies each chunk of text using a text classification pipeline.
+        Classifies the chunks of text using a text classification pipeline, running them through the model in batches.
 
         Args:
             text_chunks (List[str]): A list of text chunks to be classified.
@@ -84,7 +88,9 @@ class DocumentClassifier:
                 truncation=True,
                 clean_up_tokenization_spaces=True
             )
-            return [classification_pipeline(chunk) for chunk in text_chunks]
+            # One batched call pads the chunks together instead of running a forward pass per chunk
+            results = classification_pipeline(text_chunks, batch_size=settings.CLASSIFICATION_BATCH_SIZE)
+            return [[result] for result in results]
         except Exception as e:
             logger.error(f"Error classifying text chunks: {e}")
             raise
@@ -92,6 +98,7 @@ class DocumentClassifier:
     async def classify_document(self, text: str) -> Classification:
         """
         Classifies an entire document by breaking it into chunks and aggregating the results.
+        Results are cached by the digest of the text, so a text that was classified before skips the model.
 
         Args:
             text (str): The text content of the document to be classified.
@@ -103,6 +110,11 @@ class DocumentClassifier:
             Exception: If there's an error during the document classification process.
         """
         try:
+            cache_key = f"cls:{text_digest(text)}"
+            cached = await cache_get(cache_key)
+            if cached is not None:
+                return Classification(**cached)
+
             chunks = self.chunk_text(text)
             loop = asyncio.get_event_loop()
             with ThreadPoolExecutor() as pool:
@@ -121,7 +133,9 @@ class DocumentClassifier:
 
             # Determine the label with the highest average score
             best_label = max(combined_scores, key=combined_scores.get)
-            return Classification(label=best_label, score=combined_scores[best_label])
+            classification = Classification(label=best_label, score=combined_scores[best_label])
+            await cache_set(cache_key, classification.dict(), ttl=settings.CLASSIFICATION_CACHE_TTL)
+            return classification
         except Exception as e:
             logger.error(f"Error classifying document: {e}")
             raise
@@ -28,37 +28,50 @@ async def _usePyMuPDF(file_path):
     file_path (str): The path to the PDF file to be processed.
 
     Returns:
-    dict: Contains the file name, concatenated text, and bounding boxes.
+    dict: Contains the file name, concatenated text, bounding boxes and whether any page carries images.
     """
     try:
         text_and_boxes = []
+        has_images = False
         logger.info(f"Opening PDF with PyMuPDF: {file_path}")
 
         doc = await asyncio.to_thread(fitz.open, file_path)
-        for page_number, page in enumerate(doc, start=1):
-            blocks = page.get_text("dict")["blocks"]
-            for block in blocks:
-                if block['type'] == 0:  # Text block
-                    text = "".join([line['text'] for line in block['lines']])
-                    bbox = BoundingBox(
-                        page=page_number,
-                        bbox=coordinates(
-                            left=block['bbox'][0],
-                            top=block['bbox'][1],
-                            width=block['bbox'][2] - block['bbox'][0],
-                            height=block['bbox'][3] - block['bbox'][1]
-                        ),
-                        text=text.strip(),
-                        confidence=100.0  # PyMuPDF does not provide confidence
-                    )
-                    text_and_boxes.append(bbox)
-        doc.close()
+        try:
+            for page_number, page in enumerate(doc, start=1):
+                # Probe for images while the page is already loaded instead of walking the document again
+                if not has_images:
+                    has_images = bool(page.get_images(full=True))
+                blocks = page.get_text("dict")["blocks"]
+                for block in blocks:
+                    if block['type'] == 0:  # Text block
+                        # Lines carry no text of their own; it lives in their spans
+                        text = "".join(span['text'] for line in block['lines'] for span in line['spans'])
+                        x0, y0, x1, y1 = block['bbox']
+                        bbox = BoundingBox(
+                            page=page_number,
+                            bbox=coordinates(
+                                left=x0,
+                                top=y0,
+                                width=x1 - x0,
+                                height=y1 - y0
+                            ),
+                            text=text.strip(),
+                            confidence=100.0  # PyMuPDF does not provide confidence
+                        )
+                        text_and_boxes.append(bbox)
+        finally:
+            doc.close()
         logger.info(f"PyMuPDF extracted {len(text_and_boxes)} bounding boxes")
-        return PDFTextResponse(
+        response = PDFTextResponse(
             file_name=file_path,
             text="\n".join([bbox.text for bbox in text_and_boxes]),
             bounding_boxes=[bbox.dict() for bbox in text_and_boxes]
         ).to_dict()
+        response["has_images"] = has_images
+        return response
     except Exception as e:
         logger.error(f"Failed to extract from PDF using PyMuPDF: {e}")
-        return PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict()
+        response = PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict()
+        # The pages were not all probed, so leave OCR a chance to run
+        response["has_images"] = True
+        return response
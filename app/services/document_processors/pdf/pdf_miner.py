@@ -1,10 +1,11 @@
 # app/services/processors/pdf/pdf_miner.py
 
 import asyncio
+import numpy as np
 from pdfminer.high_level import extract_pages
 from pdfminer.layout import LTTextContainer
 from app.configs.celery_config import app
-from app.models.pdf_model import PDFTextResponse, BoundingBox, coordinates
+from app.models.pdf_model import PDFTextResponse
 from app.tasks.async_tasks import run_async_task
 from app.config import logger
 
@@ -32,31 +33,80 @@ async def _usePDFMiner(file_path):
     dict: Contains the file name, concatenated text, and bounding boxes.
     """
     try:
-        text_and_boxes = []
         logger.info(f"Extracting text from PDF using PDFMiner: {file_path}")
-        pages = await asyncio.to_thread(extract_pages, file_path)
-        for page_number, page_layout in enumerate(pages, start=1):
-            for element in page_layout:
-                if isinstance(element, LTTextContainer):
-                    text = await asyncio.to_thread(element.get_text)
-                    bbox = BoundingBox(
-                        page=page_number,
-                        bbox=coordinates(
-                            left=element.bbox[0],
-                            top=element.bbox[1],
-                            width=element.bbox[2] - element.bbox[0],
-                            height=element.bbox[3] - element.bbox[1]
-                        ),
-                        text=text.strip(),
-                        confidence=100.0  # PDFMiner does not provide confidence
-                    )
-                    text_and_boxes.append(bbox)
-        logger.info(f"PDFMiner extracted {len(text_and_boxes)} bounding boxes")
-        return PDFTextResponse(
-            file_name=file_path,
-            text="\n".join([bbox.text for bbox in text_and_boxes]),
-            bounding_boxes=[bbox.dict() for bbox in text_and_boxes]
-        ).to_dict()
+        return await asyncio.to_thread(extract_pdfminer, file_path)
     except Exception as e:
         logger.error(f"Failed to extract from PDF using PDFMiner: {e}")
         return PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict()
+
+def extract_pdfminer(file_path):
+    """
+    Extracts text and bounding boxes from a readable PDF synchronously.
+    This is the plain function behind the usePDFMiner task, for callers that are already running inside a worker.
+
+    Args:
+    file_path (str): The path to the PDF file to be processed.
+
+    Returns:
+    dict: Contains the file name, concatenated text, and bounding boxes.
+    """
+    text_and_boxes, text = _extract_sync(file_path)
+    logger.info(f"PDFMiner extracted {len(text_and_boxes)} bounding boxes")
+    # The boxes are already plain dicts in the PDFTextResponse shape, so skip the model round-trip
+    return {
+        "file_name": file_path,
+        "text": text,
+        "bounding_boxes": text_and_boxes
+    }
+
+def _extract_page_elements(page_layout, page_number):
+    """
+    Collects the text containers of a single page layout as flat tuples.
+    This runs once per layout element, so it stays a single comprehension with no per-element objects.
+
+    Args:
+    page_layout (LTPage): The layout of the page produced by pdfminer.
+    page_number (int): The 1-based page number.
+
+    Returns:
+    list: (page, bbox, text) tuples for every text container on the page.
+    """
+    return [
+        (page_number, element.bbox, element.get_text().strip())
+        for element in page_layout
+        if isinstance(element, LTTextContainer)
+    ]
+
+def _extract_sync(file_path):
+    """
+    Walks the PDF page by page, collecting the page, raw bbox and text of every text container.
+    Widths and heights are then computed for all boxes at once on a NumPy array before the dicts are built.
+
+    Args:
+    file_path (str): The path to the PDF file to be processed.
+
+    Returns:
+    tuple: The list of bounding box dicts and the newline-joined text.
+    """
+    rows = []
+    for page_number, page_layout in enumerate(extract_pages(file_path), start=1):
+        rows.extend(_extract_page_elements(page_layout, page_number))
+    pages, raw_bboxes, texts = zip(*rows) if rows else ((), (), ())
+
+    # float64 keeps the coordinates identical to what pdfminer reported
+    arr = np.asarray(raw_bboxes, dtype=np.float64).reshape(-1, 4)
+    lefts = arr[:, 0].tolist()
+    tops = arr[:, 1].tolist()
+    widths = (arr[:, 2] - arr[:, 0]).tolist()
+    heights = (arr[:, 3] - arr[:, 1]).tolist()
+
+    text_and_boxes = [
+        {
+            "page": page,
+            "bbox": {"left": left, "top": top, "width": width, "height": height},
+            "text": text,
+            "confidence": 100.0  # PDFMiner does not provide confidence
+        }
+        for page, left, top, width, height, text in zip(pages, lefts, tops, widths, heights, texts)
+    ]
+    return text_and_boxes, "\n".join(texts)
@@ -2,19 +2,78 @@
 This module defines the Tesseract OCR processing task for PDF files.
 """
 
+import io
+import os
+import csv
+import math
 import cv2
+import ctypes
+import ctypes.util
+import queue
 import asyncio
+import tempfile
+import subprocess
+import threading
 import numpy as np
 import pytesseract
 from PIL import Image
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 from skimage.transform import rotate
-from skimage.measure import label, regionprops
 from pdf2image import convert_from_path, exceptions as pdf_exceptions
-from app.config import logger
+from celery.signals import worker_process_init
+from app.config import settings, logger
 from app.configs.celery_config import app
 from app.models.pdf_model import PDFTextResponse, BoundingBox, coordinates
 from app.tasks.async_tasks import run_async_task
 
+# Leptonica image format used to hand pages to and from pixDeskew; BMP is uncompressed, so encoding is cheap
+_IFF_BMP = 1
+
+def _load_leptonica():
+    """
+    Load Leptonica (installed alongside Tesseract) and declare the deskew functions used here.
+
+    Returns:
+    ctypes.CDLL | None: The library, or None if it cannot be found or loaded.
+    """
+    name = ctypes.util.find_library('lept') or ctypes.util.find_library('leptonica')
+    if not name:
+        return None
+    try:
+        lept = ctypes.CDLL(name)
+    except OSError as e:
+        logger.warning(f"Failed to load Leptonica, falling back to OpenCV deskew: {e}")
+        return None
+    lept.pixReadMem.argtypes = [ctypes.c_char_p, ctypes.c_size_t]
+    lept.pixReadMem.restype = ctypes.c_void_p
+    lept.pixDeskew.argtypes = [ctypes.c_void_p, ctypes.c_int32]
+    lept.pixDeskew.restype = ctypes.c_void_p
+    lept.pixWriteMem.argtypes = [
+        ctypes.POINTER(ctypes.POINTER(ctypes.c_ubyte)), ctypes.POINTER(ctypes.c_size_t), ctypes.c_void_p, ctypes.c_int32
+    ]
+    lept.pixWriteMem.restype = ctypes.c_int32
+    lept.pixDestroy.argtypes = [ctypes.POINTER(ctypes.c_void_p)]
+    lept.pixDestroy.restype = None
+    lept.lept_free.argtypes = [ctypes.c_void_p]
+    lept.lept_free.restype = None
+    return lept
+
+_leptonica = _load_leptonica()
+
+# Below this elongation (0 for isotropic ink, 1 for a line) the moment-based skew estimate is not trusted
+MIN_SKEW_ANISOTROPY = 0.1
+
+# Longest page side, in pixels, that is fed to Tesseract at full resolution
+MAX_OCR_SIDE = 2500
+
+# Pool of initialised tesserocr engines, created on first use when USE_TESSEROCR is enabled
+_tesserocr_pool = None
+_tesserocr_pool_lock = threading.Lock()
+
+# Pages are OCR'd on threads: OpenCV and Tesseract release the GIL, and prefork pool children cannot start processes
+_ocr_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="ocr")
+
 # @app.task(bind=True, max_retries=3, default_retry_delay=5)
 @app.task(bind=True)
 def useTesseract(self, file_path):
@@ -45,78 +104,335 @@ async def _useTesseract(file_path):
     Returns:
     dict: Contains the file name, concatenated text, and bounding boxes.
     """
+    # The rendered pages live in this directory until OCR has finished with them
+    with tempfile.TemporaryDirectory() as output_folder:
+        try:
+            # Render on every core at 200 DPI, streaming pages to disk instead of holding them all in memory
+            images = await asyncio.to_thread(
+                convert_from_path,
+                file_path,
+                dpi=200,
+                thread_count=os.cpu_count() or 1,
+                fmt='jpeg',
+                output_folder=output_folder,
+                use_pdftocairo=True
+            )
+        except pdf_exceptions.PDFInfoNotInstalledError as e:
+            logger.error(f"PDFInfo not installed, cannot convert PDF: {e}")
+            return PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict()
+        except pdf_exceptions.PDFPageCountError as e:
+            logger.error(f"Cannot read page count: {e}")
+            return PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict()
+        except Exception as e:
+            logger.error(f"Failed to convert PDF to image: {e}")
+            return PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict()
+
+        if settings.USE_TESSEROCR:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(*(
+                loop.run_in_executor(_ocr_executor, ocr_page, image, page_number)
+                for page_number, image in enumerate(images, start=1)
+            ))
+        else:
+            results = await ocr_pages_with_tesseract_cli(images, output_folder)
+        # Flatten once; the boxes were validated when built, so emit their dicts without another model round-trip
+        all_boxes = list(chain.from_iterable(results))
+        return {
+            "file_name": file_path,
+            "text": "\n".join(box.text for box in all_boxes),
+            "bounding_boxes": [box.to_dict() for box in all_boxes]
+        }
+
+def _deskew_with_leptonica(image):
+    """Deskew the image with Leptonica's projection-profile pixDeskew."""
+    buffer = io.BytesIO()
+    image.save(buffer, format='BMP')
+    data = buffer.getvalue()
+
+    pix = ctypes.c_void_p(_leptonica.pixReadMem(data, len(data)))
+    if not pix:
+        raise RuntimeError("pixReadMem failed")
+    deskewed = ctypes.c_void_p(_leptonica.pixDeskew(pix, 0))  # 0 selects the default reduction factor
+    _leptonica.pixDestroy(ctypes.byref(pix))
+    if not deskewed:
+        raise RuntimeError("pixDeskew failed")
+
     try:
-        images = convert_from_path(file_path, dpi=300)
-    except pdf_exceptions.PDFInfoNotInstalledError as e:
-        logger.error(f"PDFInfo not installed, cannot convert PDF: {e}")
-        return PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict()
-    except pdf_exceptions.PDFPageCountError as e:
-        logger.error(f"Cannot read page count: {e}")
-        return PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict()
-    except Exception as e:
-        logger.error(f"Failed to convert PDF to image: {e}")
-        return PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict()
-
-    tasks = [process_image(image) for image in images]
-    processed_images = await asyncio.gather(*tasks)
-    results = await asyncio.gather(*(extract_text_and_boxes(image) for image in processed_images))
-    text_responses = PDFTextResponse(
-        file_name=file_path,
-        text="\n".join([box.text for result in results for box in result]),
-        bounding_boxes=[box.dict() for result in results for box in result]
-    ).to_dict()
-    return text_responses
-
-async def deskew(image):
+        out_data = ctypes.POINTER(ctypes.c_ubyte)()
+        out_size = ctypes.c_size_t()
+        if _leptonica.pixWriteMem(ctypes.byref(out_data), ctypes.byref(out_size), deskewed, _IFF_BMP) != 0:
+            raise RuntimeError("pixWriteMem failed")
+        try:
+            out = ctypes.string_at(out_data, out_size.value)
+        finally:
+            _leptonica.lept_free(ctypes.cast(out_data, ctypes.c_void_p))
+    finally:
+        _leptonica.pixDestroy(ctypes.byref(deskewed))
+    return Image.open(io.BytesIO(out)).convert('RGB')
+
+def estimate_skew(binary):
+    """
+    Estimate the skew of the ink in a binary page from its second-order central moments.
+    cv2.moments does the whole-image reduction in C, replacing a Python pass over every connected component.
+
+    Args:
+    binary (np.ndarray): The binarised page, ink non-zero.
+
+    Returns:
+    float: The counter-clockwise rotation in degrees that levels the text lines, or 0.0 when the ink has no dominant axis.
+    """
+    moments = cv2.moments(binary, binaryImage=True)
+    if moments['m00'] == 0:
+        return 0.0
+    # Roughly square ink has no dominant axis, and atan2 would return an arbitrary angle for it
+    spread = moments['mu20'] + moments['mu02']
+    if (moments['mu20'] - moments['mu02']) ** 2 + 4 * moments['mu11'] ** 2 < (MIN_SKEW_ANISOTROPY * spread) ** 2:
+        return 0.0
+    # Angle of the major axis from the x axis; y points down, so a positive angle is a clockwise tilt
+    theta = math.degrees(0.5 * math.atan2(2 * moments['mu11'], moments['mu20'] - moments['mu02']))
+    # The major axis of a portrait text block runs along its columns rather than its lines; fold it back onto them
+    if theta > 45:
+        theta -= 90
+    elif theta < -45:
+        theta += 90
+    return theta
+
+def deskew(image):
     """Deskew the given image based on text orientation."""
+    if _leptonica is not None:
+        try:
+            return _deskew_with_leptonica(image)
+        except Exception as e:
+            logger.warning(f"Leptonica deskew failed, falling back to OpenCV: {e}")
     try:
-        gray = cv2.cvtColor(np.array(image), cv2.COLOR_BGR2GRAY)
+        gray = cv2.cvtColor(np.asarray(image), cv2.COLOR_BGR2GRAY)
         _, binary = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-        label_img = label(binary)
-        regions = regionprops(label_img)
-        angle = regions[0].orientation * 180 / np.pi
-        skew_angle = angle if angle < 90 else angle - 180
-        deskewed = rotate(image, skew_angle, resize=True)
+        skew_angle = estimate_skew(binary)
+        if abs(skew_angle) < 0.1 or abs(skew_angle) > 45:
+            # Nothing to correct, or no dominant text direction to trust
+            return image
+        deskewed = rotate(np.asarray(image), skew_angle, resize=True)
         return Image.fromarray(cv2.convertScaleAbs(deskewed, alpha=(255.0)))
     except Exception as e:
         logger.error(f"Failed to deskew image: {e}")
         return image  # Return original image if deskewing fails
 
-async def process_image(image):
-    """Convert and preprocess image for OCR."""
+def process_image(image):
+    """
+    Convert and preprocess image for OCR.
+    Pages whose longest side exceeds MAX_OCR_SIDE are halved; Tesseract gains nothing from the extra pixels.
+
+    Returns:
+    tuple: The preprocessed image (None if processing fails) and the scale that was applied to it.
+    """
     try:
-        deskewed = await deskew(image)
-        gray = cv2.cvtColor(np.array(deskewed), cv2.COLOR_BGR2GRAY)
-        _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-        resized = cv2.resize(thresh, None, fx=1, fy=1, interpolation=cv2.INTER_CUBIC)
-        kernel = np.ones((1, 1), np.uint8)
-        processed_img = cv2.dilate(resized, kernel, iterations=1)
-        processed_img = cv2.erode(processed_img, kernel, iterations=1)
-        return Image.fromarray(processed_img)
+        deskewed = deskew(image)
+        gray = cv2.cvtColor(np.asarray(deskewed), cv2.COLOR_BGR2GRAY)
+        scale = 1.0
+        if max(gray.shape[:2]) > MAX_OCR_SIDE:
+            scale = 0.5
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        # Threshold in place; the former fx=1 resize and 1x1 dilate/erode were identity operations
+        cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU, dst=gray)
+        return Image.fromarray(gray), scale
     except Exception as e:
         logger.error(f"Error processing image: {e}")
-        return None  # Return None if processing fails
+        return None, 1.0  # Return None if processing fails
 
-async def extract_text_and_boxes(image):
-    """Extract text and bounding boxes using pytesseract from the processed image."""
-    if image is None:
+def rescale_boxes(boxes, scale):
+    """Map boxes found on a downscaled page back to the coordinates of the rendered page."""
+    if scale == 1.0:
+        return boxes
+    for box in boxes:
+        box.bbox = coordinates(
+            left=box.bbox.left / scale,
+            top=box.bbox.top / scale,
+            width=box.bbox.width / scale,
+            height=box.bbox.height / scale
+        )
+    return boxes
+
+def ocr_page(image, page_number):
+    """Preprocess a single page image and OCR it; runs on the OCR thread pool."""
+    processed_image, scale = process_image(image)
+    return rescale_boxes(extract_text_and_boxes(processed_image, page_number), scale)
+
+async def ocr_pages_with_tesseract_cli(images, work_dir):
+    """
+    Preprocess the pages in parallel, then OCR them with the tesseract CLI in list-file batches.
+    Each batch starts the engine once for many pages; one batch per core keeps every core busy.
+
+    Args:
+    images (list): The rendered page images.
+    work_dir (str): A scratch directory for the preprocessed pages and tesseract's output.
+
+    Returns:
+    list: A list of BoundingBox lists, one per batch.
+    """
+    loop = asyncio.get_running_loop()
+    processed_images = await asyncio.gather(*(
+        loop.run_in_executor(_ocr_executor, process_image, image) for image in images
+    ))
+    pages = [
+        (page_number, image, scale)
+        for page_number, (image, scale) in enumerate(processed_images, start=1) if image is not None
+    ]
+    if not pages:
         return []
+
+    batch_count = min(os.cpu_count() or 1, len(pages))
+    batch_size = -(-len(pages) // batch_count)
+    batches = [pages[i:i + batch_size] for i in range(0, len(pages), batch_size)]
+    return await asyncio.gather(*(
+        loop.run_in_executor(_ocr_executor, _ocr_batch_with_tesseract_cli, batch, work_dir) for batch in batches
+    ))
+
+def _ocr_batch_with_tesseract_cli(pages, work_dir):
+    """
+    Run one tesseract process over a list file of page images and collect word-level boxes from its TSV output.
+    If the batch fails, its pages are OCR'd one at a time with pytesseract instead.
+    """
+    try:
+        batch_id = pages[0][0]
+        page_paths = []
+        for page_number, image, _ in pages:
+            # PGM is uncompressed, so writing and reading the pages stays cheap
+            path = os.path.join(work_dir, f"ocr_page_{page_number:05d}.pgm")
+            image.save(path)
+            page_paths.append(path)
+        list_file = os.path.join(work_dir, f"ocr_batch_{batch_id:05d}.txt")
+        with open(list_file, 'w') as f:
+            f.write("\n".join(page_paths))
+
+        output_base = os.path.join(work_dir, f"ocr_batch_{batch_id:05d}")
+        subprocess.run(
+            [pytesseract.pytesseract.tesseract_cmd, list_file, output_base, '--oem', '3', '--psm', '6', 'tsv'],
+            check=True,
+            capture_output=True,
+            # Batches already run one per core, so keep each tesseract single-threaded
+            env={**os.environ, 'OMP_THREAD_LIMIT': '1'}
+        )
+
+        text_and_boxes = []
+        with open(f"{output_base}.tsv", newline='') as f:
+            for row in csv.DictReader(f, delimiter='\t', quoting=csv.QUOTE_NONE):
+                text = (row.get('text') or '').strip()
+                if not text or int(float(row['conf'])) <= 60:
+                    continue
+                # page_num is the 1-based position of the image in the list file
+                page_number, _, scale = pages[int(row['page_num']) - 1]
+                text_and_boxes.append(BoundingBox(
+                    page=page_number,
+                    bbox=coordinates(
+                        left=int(row['left']) / scale,
+                        top=int(row['top']) / scale,
+                        width=int(row['width']) / scale,
+                        height=int(row['height']) / scale
+                    ),
+                    text=text,
+                    confidence=float(row['conf'])
+                ))
+        return text_and_boxes
+    except Exception as e:
+        logger.warning(f"Tesseract batch failed, falling back to per-page OCR: {e}")
+        return list(chain.from_iterable(
+            rescale_boxes(extract_text_and_boxes(image, page_number), scale) for page_number, image, scale in pages
+        ))
+
+def _get_tesserocr_pool():
+    """
+    Return the pool of tesserocr engines, creating it on first use.
+    Each engine keeps Tesseract initialised across pages, so there is no subprocess or temp file per page.
+    """
+    global _tesserocr_pool
+    with _tesserocr_pool_lock:
+        if _tesserocr_pool is None:
+            from tesserocr import PyTessBaseAPI, OEM, PSM
+            pool = queue.Queue()
+            for _ in range(settings.TESSEROCR_POOL_SIZE):
+                pool.put(PyTessBaseAPI(lang='eng', oem=OEM.DEFAULT, psm=PSM.SINGLE_BLOCK))
+            _tesserocr_pool = pool
+    return _tesserocr_pool
+
+@worker_process_init.connect
+def warm_up_tesserocr(**kwargs):
+    """
+    Create the tesserocr pool when the worker starts and run a tiny OCR on every engine.
+    This pages in the trained data up front, so the first OCR task in the worker does not pay for it.
+    """
+    if not settings.USE_TESSEROCR:
+        return
     try:
-        ocr_data = pytesseract.image_to_data(image, config='--oem 3 --psm 6', output_type=pytesseract.Output.DICT)
-        text_and_boxes = [
-            BoundingBox(
-                page=int(ocr_data['page_num'][i]),
-                bbox=coordinates(
-                    left=ocr_data['left'][i],
-                    top=ocr_data['top'][i],
-                    width=ocr_data['width'][i],
-                    height=ocr_data['height'][i]
-                ),
-                text=ocr_data['text'][i].strip(),
-                confidence=float(ocr_data['conf'][i])
-            ) for i in range(len(ocr_data['text'])) if int(ocr_data['conf'][i]) > 60 and ocr_data['text'][i].strip()
-        ]
+        pool = _get_tesserocr_pool()
+        blank = Image.new('L', (10, 10), 255)
+        engines = [pool.get() for _ in range(settings.TESSEROCR_POOL_SIZE)]
+        try:
+            for api in engines:
+                api.SetImage(blank)
+                api.GetUTF8Text()
+                api.Clear()
+        finally:
+            for api in engines:
+                pool.put(api)
+        logger.info(f"Warmed up {len(engines)} tesserocr engines")
+    except Exception as e:
+        logger.error(f"Failed to warm up tesserocr: {e}")
+
+def _ocr_with_tesserocr(image, page_number):
+    """Run OCR on the image with a pooled tesserocr engine and collect word-level boxes."""
+    from tesserocr import RIL, iterate_level
+    pool = _get_tesserocr_pool()
+    api = pool.get()
+    try:
+        api.SetImage(image)
+        api.Recognize()
+        text_and_boxes = []
+        for word in iterate_level(api.GetIterator(), RIL.WORD):
+            text = (word.GetUTF8Text(RIL.WORD) or "").strip()
+            confidence = word.Confidence(RIL.WORD)
+            if not text or int(confidence) <= 60:
+                continue
+            x1, y1, x2, y2 = word.BoundingBox(RIL.WORD)
+            text_and_boxes.append(BoundingBox(
+                page=page_number,
+                bbox=coordinates(left=x1, top=y1, width=x2 - x1, height=y2 - y1),
+                text=text,
+                confidence=confidence
+            ))
         return text_and_boxes
+    finally:
+        api.Clear()
+        pool.put(api)
+
+def _ocr_with_pytesseract(image, page_number):
+    """Run OCR on the image with the pytesseract CLI wrapper and collect word-level boxes."""
+    ocr_data = pytesseract.image_to_data(image, config='--oem 3 --psm 6', output_type=pytesseract.Output.DICT)
+    # Filter every token at once and only build boxes for the survivors; int() truncation is kept for the threshold
+    conf = np.asarray(ocr_data['conf'], dtype=np.float64)
+    texts = np.char.strip(np.asarray(ocr_data['text'], dtype=str))
+    keep = np.flatnonzero((conf.astype(np.int64) > 60) & (np.char.str_len(texts) > 0))
+    return [
+        BoundingBox(
+            page=page_number,
+            bbox=coordinates(
+                left=ocr_data['left'][i],
+                top=ocr_data['top'][i],
+                width=ocr_data['width'][i],
+                height=ocr_data['height'][i]
+            ),
+            text=str(texts[i]),
+            confidence=float(conf[i])
+        ) for i in keep.tolist()
+    ]
+
+def extract_text_and_boxes(image, page_number):
+    """Extract text and bounding boxes from the processed image of the given page."""
+    if image is None:
+        return []
+    try:
+        if settings.USE_TESSEROCR:
+            return _ocr_with_tesserocr(image, page_number)
+        return _ocr_with_pytesseract(image, page_number)
     except Exception as e:
         logger.error(f"Failed to extract text and bounding boxes: {e}")
         return []
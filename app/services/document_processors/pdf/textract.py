@@ -3,16 +3,94 @@
 This module defines the PDF processing task using AWS Textract.
 """
 
+import random
 import asyncio
-from aiobotocore.session import AioSession
+import weakref
+from operator import itemgetter
+from contextlib import asynccontextmanager
+from aiolimiter import AsyncLimiter
+from aiobotocore.config import AioConfig
+from botocore.exceptions import ClientError
 from app.configs.celery_config import app
-from app.models.pdf_model import PDFTextResponse, BoundingBox, coordinates
+from app.models.pdf_model import PDFTextResponse
 from app.config import settings, logger
-from app.tasks.async_tasks import run_async_task
-from app.services.aws_services import upload_file_to_s3
+from app.tasks.async_tasks import run_async_task, is_worker_loop, add_worker_loop_cleanup
+from app.services.aws_services import SESSION, upload_file_to_s3
+
+# Enough pooled keep-alive connections for concurrent jobs, with client-side rate limiting on throttling
+TEXTRACT_CLIENT_CONFIG = AioConfig(
+    max_pool_connections=settings.TEXTRACT_MAX_POOL_CONNECTIONS,
+    tcp_keepalive=True,
+    retries={'max_attempts': settings.TEXTRACT_MAX_ATTEMPTS, 'mode': 'adaptive'}
+)
+
+# Fetches the four coordinates of a Textract BoundingBox in one C-level call
+BBOX_FIELDS = itemgetter('Left', 'Top', 'Width', 'Height')
+
+# Error codes of throttled calls that are still worth one more attempt once the SDK's own retries are exhausted
+THROTTLING_ERROR_CODES = {'ThrottlingException', 'ProvisionedThroughputExceededException', 'LimitExceededException'}
+
+# Token buckets sized to Textract's Start*/Get* TPS quotas, so concurrent jobs queue locally instead of being throttled
+START_LIMITER = AsyncLimiter(settings.TEXTRACT_START_TPS, 1)
+GET_LIMITER = AsyncLimiter(settings.TEXTRACT_GET_TPS, 1)
+
+# Long-lived Textract clients, one per event loop (a client cannot be shared across loops), with their open contexts
+_textract_clients = weakref.WeakKeyDictionary()
+_textract_client_locks = weakref.WeakKeyDictionary()
+
+def create_textract_client():
+    """
+    Create the context manager for a new Textract client.
+    """
+    return SESSION.create_client('textract', region_name=settings.AWS_REGION,
+                                 aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                                 config=TEXTRACT_CLIENT_CONFIG)
+
+async def get_textract_client():
+    """
+    Return the long-lived Textract client of the running event loop, opening it on first use.
+    Credential resolution, client construction and TLS setup then happen once per process instead of per document,
+    and only in processes that actually run Textract jobs. A client opened on the worker loop is closed with it.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _textract_clients.get(loop)
+    if entry is None:
+        lock = _textract_client_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            entry = _textract_clients.get(loop)
+            if entry is None:
+                context = create_textract_client()
+                entry = (context, await context.__aenter__())
+                _textract_clients[loop] = entry
+                if is_worker_loop(loop):
+                    add_worker_loop_cleanup(close_textract_client)
+    return entry[1]
+
+async def close_textract_client():
+    """
+    Close the long-lived Textract client of the running event loop, if one was opened.
+    """
+    entry = _textract_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[0].__aexit__(None, None, None)
+
+@asynccontextmanager
+async def textract_client():
+    """
+    Yield the long-lived Textract client on loops that outlive a single task (the worker loop, or one that already
+    opened a client); short-lived loops get a client that is closed with the block.
+    """
+    loop = asyncio.get_running_loop()
+    if loop in _textract_clients or is_worker_loop(loop):
+        yield await get_textract_client()
+    else:
+        async with create_textract_client() as client:
+            yield client
 
 # @app.task(bind=True, max_retries=3, default_retry_delay=5)
-@app.task(bind=True)
+# The rate limit lets the pdf_ocr queue absorb bursts while workers start jobs at Textract's pace
+@app.task(bind=True, rate_limit=settings.TEXTRACT_TASK_RATE_LIMIT)
 def useTextract(self, file_path):
     """
     Process PDFs with AWS Textract.
@@ -31,6 +109,23 @@ def useTextract(self, file_path):
         # Retry logic for large files or temporary issues
         raise self.retry(exc=e)
 
+@app.task(bind=True, rate_limit=settings.TEXTRACT_TASK_RATE_LIMIT)
+def useTextractBatch(self, file_paths):
+    """
+    Process several PDFs with AWS Textract in one task, running their jobs concurrently.
+
+    Args:
+    file_paths (list): The paths to the PDF files.
+
+    Returns:
+    list: A PDFTextResponse dict per file, in the order of file_paths.
+    """
+    try:
+        return run_async_task(_useTextractBatch, file_paths)
+    except Exception as e:
+        logger.error(f"Failed to process PDFs with Textract: {e}")
+        raise self.retry(exc=e)
+
 async def _useTextract(file_path):
     """
     Process PDFs with AWS Textract asynchronously.
@@ -41,35 +136,92 @@ async def _useTextract(file_path):
     Returns:
     dict: PDFTextResponse containing the file name, concatenated text, and bounding boxes.
     """
+    results = await _useTextractBatch([file_path])
+    return results[0]
+
+async def _useTextractBatch(file_paths):
+    """
+    Upload, submit and poll all the PDFs concurrently over a single Textract client.
+
+    Args:
+    file_paths (list): The paths to the PDF files.
+
+    Returns:
+    list: A PDFTextResponse dict per file, in the order of file_paths; empty for files that failed.
+    """
     try:
-        logger.info("Processing PDFs with Textract")
+        logger.info(f"Processing {len(file_paths)} PDFs with Textract")
+
+        # Upload files to S3
+        s3_file_keys = await asyncio.gather(*(upload_file_to_s3(path) for path in file_paths), return_exceptions=True)
+
+        async with textract_client() as client:
+            responses = await asyncio.gather(*(
+                process_document(client, path, s3_file_key) for path, s3_file_key in zip(file_paths, s3_file_keys)
+            ))
+            logger.info("Processed all PDFs with Textract")
+            return responses
+    except Exception as e:
+        logger.error(f"Failed to process PDFs with Textract: {e}")
+        return [PDFTextResponse(file_name=path, text="", bounding_boxes=[]).to_dict() for path in file_paths]
+
+async def process_document(client, file_path, s3_file_key):
+    """
+    Run a single uploaded PDF through Textract text detection.
+
+    Args:
+    client (obj): The Textract client.
+    file_path (str): The local path of the PDF file.
+    s3_file_key (str | Exception): The S3 key the file was uploaded under, or the upload error.
 
-        # Upload file to S3
-        s3_file_key = await upload_file_to_s3(file_path)
+    Returns:
+    dict: PDFTextResponse containing the file name, concatenated text, and bounding boxes.
+    """
+    try:
+        if isinstance(s3_file_key, Exception):
+            raise s3_file_key
         logger.info(f"Uploaded file to S3 with key: {s3_file_key}")
 
         # Prepare the document reference for Textract
         document = {'Bucket': settings.AWS_S3_BUCKET_NAME, 'Name': s3_file_key}
 
-        session = AioSession()
-        async with session.create_client('textract', region_name=settings.AWS_REGION,
-                                         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                                         aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY) as client:
-            logger.info(f"Submitting document to Textract: {document}")
-            job_id = await submit_document(client, document)
-            logger.info(f"Submitted document to Textract, job ID: {job_id}")
-            result = await get_result(client, job_id)
-            logger.info(f"Retrieved result from Textract for job ID: {job_id}")
-            response = process_result(result, document['Name'])
-            logger.info("Processed all PDFs with Textract")
-            return response
+        logger.info(f"Submitting document to Textract: {document}")
+        job_id = await retry_once_on_throttling(submit_document, client, document)
+        logger.info(f"Submitted document to Textract, job ID: {job_id}")
+        result = await retry_once_on_throttling(get_result, client, job_id)
+        logger.info(f"Retrieved result from Textract for job ID: {job_id}")
+        return process_result(result, document['Name'])
     except Exception as e:
-        logger.error(f"Failed to process PDFs with Textract: {e}")
+        logger.error(f"Failed to process {file_path} with Textract: {e!r}")
         return PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict()
 
+async def retry_once_on_throttling(func, *args):
+    """
+    Await a Textract step, retrying it once after a jittered pause if it is still throttled.
+    Retrying just the throttled step keeps an uploaded file or a running job from being thrown away,
+    which would otherwise force the whole document to be processed again.
+
+    Args:
+    func (callable): The coroutine function of the step.
+    *args: Arguments to pass to the step.
+
+    Returns:
+    result: The result of the step.
+    """
+    try:
+        return await func(*args)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in THROTTLING_ERROR_CODES:
+            raise
+        delay = random.uniform(settings.TEXTRACT_POLL_MAX / 2, settings.TEXTRACT_POLL_MAX)
+        logger.warning(f"{func.__name__} throttled by Textract, retrying in {delay:.1f}s: {e}")
+        await asyncio.sleep(delay)
+        return await func(*args)
+
 async def submit_document(client, document):
     """
     Submit a document for text detection to AWS Textract.
+    Throttled calls are retried by the client's adaptive retry mode; other errors propagate to process_document.
 
     Args:
     client (obj): The Textract client.
@@ -78,16 +230,10 @@ async def submit_document(client, document):
     Returns:
     str: Job ID.
     """
-    try:
+    async with START_LIMITER:
         response = await client.start_document_text_detection(DocumentLocation={'S3Object': document})
-        logger.info(f"Started text detection for document: {document['Name']}, Job ID: {response['JobId']}")
-        return response['JobId']
-    except KeyError as e:
-        logger.error(f"DocumentLocation missing in Textract result: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"Error starting text detection: {e}")
-        raise
+    logger.info(f"Started text detection for document: {document['Name']}, Job ID: {response['JobId']}")
+    return response['JobId']
 
 async def get_result(client, job_id):
     """
@@ -100,102 +246,99 @@ async def get_result(client, job_id):
     Returns:
     dict: Textract response.
     """
-    try:
-        attempts = 0
-        wait_time = 5  # Start with no wait time
-        max_attempts = 10  # Set a maximum number of attempts
-        max_timeout = settings.PDF_PROCESSING_TIMEOUT  # Set a timeout for the entire operation (in seconds)
-
-        while attempts < max_attempts:
-            response = await asyncio.wait_for(client.get_document_text_detection(JobId=job_id), timeout=max_timeout)
-            logger.info(f"Job Status for {job_id}: {response['JobStatus']}")
-            if response['JobStatus'] in ['SUCCEEDED', 'FAILED']:
-                break
-
-            attempts += 1
-            wait_time *= 2  # Incremental delay of 5 seconds
-            logger.warning(f"Attempt {attempts} for Job ID {job_id}. Waiting {wait_time} seconds before next attempt.")
-            await asyncio.sleep(wait_time)
-
-        if response['JobStatus'] == 'SUCCEEDED':
-            logger.info(f"Retrieved document text detection result for Job ID {job_id}")
-            return response
-        else:
-            raise TimeoutError(f"Failed to complete job {job_id} after {max_attempts} attempts.")
+    # Cap the whole polling loop rather than each request
+    response = await asyncio.wait_for(poll_job(client, job_id), timeout=settings.PDF_PROCESSING_TIMEOUT)
 
-    except asyncio.TimeoutError:
-        logger.error(f"Timeout occurred while retrieving document text for Job ID {job_id}")
-        raise
-    except Exception as e:
-        logger.error(f"Failed to retrieve document text for Job ID {job_id}: {e}")
-        raise
+    if response['JobStatus'] == 'SUCCEEDED':
+        # Results come back at most 1000 blocks at a time; follow NextToken to collect the rest,
+        # keeping only the LINE blocks so the WORD blocks of large documents are never accumulated
+        blocks = list(line_blocks(response['Blocks']))
+        next_token = response.get('NextToken')
+        while next_token:
+            async with GET_LIMITER:
+                page = await client.get_document_text_detection(JobId=job_id, NextToken=next_token)
+            blocks.extend(line_blocks(page['Blocks']))
+            next_token = page.get('NextToken')
+        response['Blocks'] = blocks
+        response.pop('NextToken', None)
+        logger.info(f"Retrieved document text detection result for Job ID {job_id}")
+        return response
+    else:
+        raise RuntimeError(f"Textract job {job_id} failed: {response.get('StatusMessage', 'no status message')}")
 
-def process_result(result, doc_name):
+async def poll_job(client, job_id, base_delay=None, max_delay=None):
     """
-    Process Textract result.
+    Poll a text detection job with exponential backoff and full jitter until it finishes.
+    The jitter spreads the polls of concurrent jobs apart, so they do not hit the Get* rate limit in lockstep.
 
     Args:
-    result (dict): Textract response.
-    doc_name (str): Document name.
+    client (obj): The Textract client.
+    job_id (str): The job ID.
+    base_delay (float): The initial backoff ceiling in seconds; defaults to settings.TEXTRACT_POLL_BASE.
+    max_delay (float): The upper bound on the backoff ceiling in seconds; defaults to settings.TEXTRACT_POLL_MAX.
 
     Returns:
-    dict: PDFTextResponse containing the file name, concatenated text, and bounding boxes.
+    dict: The first Textract response whose status is SUCCEEDED or FAILED.
     """
-    try:
-        text = extract_text(result)
-        bounding_boxes = extract_bounding_boxes(result)
-        cleaned_filename = '_'.join(doc_name.split('_')[1:])
-        logger.info(f"Processed Textract result for document: {cleaned_filename}")
-        return PDFTextResponse(file_name=cleaned_filename, text=text, bounding_boxes=bounding_boxes).to_dict()
-    except Exception as e:
-        logger.error(f"Failed to process result: {e}")
-        return PDFTextResponse(file_name=doc_name, text="", bounding_boxes=[]).to_dict()
+    delay = base_delay if base_delay is not None else settings.TEXTRACT_POLL_BASE
+    max_delay = max_delay if max_delay is not None else settings.TEXTRACT_POLL_MAX
+    while True:
+        async with GET_LIMITER:
+            response = await client.get_document_text_detection(JobId=job_id)
+        logger.info(f"Job Status for {job_id}: {response['JobStatus']}")
+        if response['JobStatus'] in ('SUCCEEDED', 'FAILED'):
+            return response
+        await asyncio.sleep(random.uniform(0, delay))
+        delay = min(delay * 2, max_delay)
 
-def extract_text(result):
+def line_blocks(blocks):
     """
-    Extract text from Textract result.
+    Yield the LINE blocks of a page of Textract blocks.
 
     Args:
-    result (dict): Textract response.
+    blocks (list): Textract blocks.
 
     Returns:
-    str: Extracted text.
+    generator: The blocks whose BlockType is LINE.
     """
-    try:
-        logger.info("Extracting text from Textract result")
-        return '\n'.join(block['Text'] for block in result['Blocks'] if block['BlockType'] == 'LINE')
-    except Exception as e:
-        logger.error(f"Error extracting text: {e}")
-        return ""
+    return (block for block in blocks if block['BlockType'] == 'LINE')
 
-def extract_bounding_boxes(result):
+def process_result(result, doc_name):
     """
-    Extract bounding boxes from Textract result.
+    Process Textract result, collecting the text and bounding box of every LINE block in a single pass.
 
     Args:
     result (dict): Textract response.
+    doc_name (str): Document name.
 
     Returns:
-    list: List of BoundingBox objects.
+    dict: PDFTextResponse containing the file name, concatenated text, and bounding boxes.
     """
     try:
-        logger.info("Extracting bounding boxes from Textract result")
-        return [
-            BoundingBox(
-                page=block['Page'] if 'Page' in block else 1,
-                bbox=coordinates(
-                    left=block['Geometry']['BoundingBox']['Left'],
-                    top=block['Geometry']['BoundingBox']['Top'],
-                    width=block['Geometry']['BoundingBox']['Width'],
-                    height=block['Geometry']['BoundingBox']['Height']
-                ),
-                text=block['Text'],
-                confidence=block['Confidence']
-            ) for block in result['Blocks'] if block['BlockType'] == 'LINE'
-        ]
+        texts = []
+        bounding_boxes = []
+        append_text = texts.append
+        append_box = bounding_boxes.append
+        for block in line_blocks(result['Blocks']):
+            left, top, width, height = BBOX_FIELDS(block['Geometry']['BoundingBox'])
+            text = block['Text']
+            append_text(text)
+            append_box({
+                "page": block.get('Page', 1),
+                "bbox": {"left": left, "top": top, "width": width, "height": height},
+                "text": text,
+                "confidence": block['Confidence']
+            })
+        cleaned_filename = '_'.join(doc_name.split('_')[1:])
+        logger.info(f"Processed Textract result for document: {cleaned_filename}")
+        return {
+            "file_name": cleaned_filename,
+            "text": '\n'.join(texts),
+            "bounding_boxes": bounding_boxes
+        }
     except Exception as e:
-        logger.error(f"Error extracting bounding boxes: {e}")
-        return []
+        logger.error(f"Failed to process result: {e}")
+        return PDFTextResponse(file_name=doc_name, text="", bounding_boxes=[]).to_dict()
 
 # Example usage:
 if __name__ == "__main__":
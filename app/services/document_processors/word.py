@@ -1,21 +1,85 @@
 # /app/services/processors/word.py
 """
-This module defines the Word processing logic using python-docx.
+This module defines the Word processing logic, reading the paragraphs straight from the document XML with lxml.
 """
 
-import json
+import orjson
 import asyncio
-from docx import Document
+import zipfile
+from lxml import etree
 from app.config import logger
 
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+W_BODY = f'{{{W_NS}}}body'
+W_P = f'{{{W_NS}}}p'
+W_T = f'{{{W_NS}}}t'
+W_TAB = f'{{{W_NS}}}tab'
+W_BR = f'{{{W_NS}}}br'
+W_CR = f'{{{W_NS}}}cr'
+W_NO_BREAK_HYPHEN = f'{{{W_NS}}}noBreakHyphen'
+W_PTAB = f'{{{W_NS}}}ptab'
+W_TYPE = f'{{{W_NS}}}type'
+# Run content of a paragraph, including runs inside hyperlinks, as python-docx reads it
+RUN_CONTENT = etree.XPath('./w:r/*|./w:hyperlink/w:r/*', namespaces={'w': W_NS})
+
+def paragraph_text(paragraph):
+    """
+    Get the text of a paragraph element, mapping run content the way python-docx does: tabs become '\\t',
+    line breaks '\\n' and non-breaking hyphens '-'; page and column breaks add nothing.
+
+    Args:
+    paragraph (Element): A w:p element.
+
+    Returns:
+    str: The paragraph text.
+    """
+    parts = []
+    for child in RUN_CONTENT(paragraph):
+        if child.tag == W_T:
+            parts.append(child.text or '')
+        elif child.tag in (W_TAB, W_PTAB):
+            parts.append('\t')
+        elif child.tag == W_CR:
+            parts.append('\n')
+        elif child.tag == W_BR:
+            if child.get(W_TYPE, 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        elif child.tag == W_NO_BREAK_HYPHEN:
+            parts.append('-')
+    return ''.join(parts)
+
+def read_docx_paragraphs(file_path):
+    """
+    Read the text of the body paragraphs of a Word document.
+    The document XML is streamed with iterparse and each paragraph is freed once read, so memory stays flat
+    and no python-docx wrapper objects are built.
+
+    Args:
+    file_path (str): The path to the Word file.
+
+    Returns:
+    list: The text of each body paragraph, in document order.
+    """
+    paragraphs = []
+    with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as document:
+        for _, element in etree.iterparse(document, tag=W_P):
+            parent = element.getparent()
+            # Paragraphs nested in tables or text boxes are not body paragraphs
+            if parent is None or parent.tag != W_BODY:
+                continue
+            paragraphs.append(paragraph_text(element))
+            element.clear()
+            while element.getprevious() is not None:
+                del parent[0]
+    return paragraphs
+
 async def useDocX(file_path):
     try:
-        document = await asyncio.to_thread(Document, file_path)
-        paragraphs = [p.text for p in document.paragraphs]
+        paragraphs = await asyncio.to_thread(read_docx_paragraphs, file_path)
         json_data = {
             'paragraphs': paragraphs
         }
-        return json.dumps(json_data)
+        return orjson.dumps(json_data).decode()
 
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
@@ -24,3 +88,15 @@ async def useDocX(file_path):
     except Exception as e:
         logger.error(f"Failed to process Word file {file_path}: {e}")
         raise
+
+async def useDocXBatch(file_paths):
+    """
+    Process several Word files concurrently, reading each on its own thread.
+
+    Args:
+    file_paths (list): The paths to the Word files.
+
+    Returns:
+    list: The JSON output of useDocX for each file, in the order of file_paths; the exception for files that failed.
+    """
+    return await asyncio.gather(*(useDocX(file_path) for file_path in file_paths), return_exceptions=True)
@@ -5,11 +5,27 @@ This module defines the document segmentation service for the FastAPI applicatio
 import gc
 import spacy
 import torch
+from functools import lru_cache
 from typing import List, Dict, Any
 from app.models.rag_model import Segment, BoundingBox
 from app.models.pdf_model import PDFTextResponse
 from app.config import logger
 
+# Components of en_core_web_sm that sentence segmentation does not use
+SPACY_EXCLUDED_COMPONENTS = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer", "ner"]
+
+@lru_cache(maxsize=1)
+def load_sentence_segmenter() -> spacy.Language:
+    """
+    Load the spaCy pipeline used for sentence segmentation once per process; it holds no per-document state,
+    so every DocumentSegmenter shares it.
+    Only sentence boundaries are needed, so the statistical components are left out and the rule-based
+    sentencizer splits the tokenized text instead.
+    """
+    nlp = spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDED_COMPONENTS)
+    nlp.add_pipe("sentencizer")
+    return nlp
+
 class DocumentSegmenter:
     """
     A service class for segmenting documents into smaller units (e.g., sentences).
@@ -26,7 +42,7 @@ class DocumentSegmenter:
         """
         try:
             # Load the spaCy model for text segmentation
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = load_sentence_segmenter()
         except Exception as e:
             logger.error(f"Error initializing DocumentSegmenter: {e}")
             raise
@@ -74,17 +90,18 @@ class DocumentSegmenter:
         """
         try:
             logger.info("Segmenting document using bounding boxes.")
+            # The fields are converted to their model types here, so construct() skips re-validating every segment
             segments = [
-                Segment(
+                Segment.construct(
                     serial=index,
-                    page=bbox["page"],
-                    bbox=BoundingBox(
+                    page=int(bbox["page"]),
+                    bbox=BoundingBox.construct(
                         left=float(bbox["bbox"]["left"]),
                         top=float(bbox["bbox"]["top"]),
                         width=float(bbox["bbox"]["width"]),
                         height=float(bbox["bbox"]["height"]),
                     ),
-                    text=bbox["text"],
+                    text=str(bbox["text"]),
                     confidence=float(bbox["confidence"])  # Convert to regular float
                 )
                 for index, bbox in enumerate(result["bounding_boxes"])
@@ -112,7 +129,7 @@ class DocumentSegmenter:
             
             doc = self.nlp(text)
             segments = [
-                Segment(
+                Segment.construct(
                     serial=index,
                     text=sent.text,
                     confidence=1.0  # spaCy's NLP output is deterministic, so full confidence
@@ -8,16 +8,19 @@ import torch
 import asyncio
 from typing import List, Dict, Any
 from concurrent.futures import ThreadPoolExecutor
-from transformers import BertTokenizer, BertForTokenClassification, pipeline
+from transformers import BertTokenizerFast, BertForTokenClassification, pipeline
 from app.models.rag_model import Entity
 from app.config import logger
+from app.utils.torch_utils import configure_torch_threads
+
+configure_torch_threads()
 
 class EntityRecognizer:
     """
     A service class for recognizing named entities in a given text using a BERT-based model.
 
     Attributes:
-        tokenizer (BertTokenizer): Tokenizer for text processing.
+        tokenizer (BertTokenizerFast): Tokenizer for text processing.
         model (BertForTokenClassification): Model for token classification.
     """
     
@@ -29,7 +32,7 @@ class EntityRecognizer:
             Exception: If there's an error during initialization.
         """
         try:
-            self.tokenizer = BertTokenizer.from_pretrained("dbmdz/bert-large-cased-finetuned-conll03-english")
+            self.tokenizer = BertTokenizerFast.from_pretrained("dbmdz/bert-large-cased-finetuned-conll03-english")
             self.model = BertForTokenClassification.from_pretrained("dbmdz/bert-large-cased-finetuned-conll03-english")
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
         except Exception as e:
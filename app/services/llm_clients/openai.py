@@ -6,10 +6,37 @@ This module contains functions to interact with the OpenAI API.
 import ssl
 import json
 import asyncio
-from aiohttp import ClientSession
+import logging
+import weakref
+from aiohttp import ClientSession, TCPConnector
 from app.config import Settings, logger
 from app.utils.llm_utils import default_system_prompt, default_user_prompt
 
+SSL_CONTEXT = ssl._create_unverified_context()
+
+# One HTTP session per event loop (an aiohttp session is bound to its loop), so requests reuse pooled
+# keep-alive connections instead of paying a TCP and TLS handshake each
+_sessions = weakref.WeakKeyDictionary()
+
+def get_session() -> ClientSession:
+    """
+    Return the HTTP session of the running event loop, creating it on first use.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = ClientSession(connector=TCPConnector(limit=Settings.OPENAI_MAX_CONNECTIONS, ssl=SSL_CONTEXT))
+        _sessions[loop] = session
+    return session
+
+async def close_session():
+    """
+    Close the HTTP session of the running event loop, if one was opened.
+    """
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
 async def send_openai_request(messages: dict) -> dict:
     """
     Send an asynchronous POST request to the OpenAI API with the given messages.
@@ -22,51 +49,51 @@ async def send_openai_request(messages: dict) -> dict:
         'Content-Type': 'application/json'
     }
 
-    ssl_context = ssl._create_unverified_context()
-
-    async with ClientSession() as session:
-        try:
-            # Log the payload being sent
-            payload = {
-                "model": "gpt-3.5-turbo",
-                "messages": messages,
-                "max_tokens": 1000,
-                "temperature": 0.0
-            }
+    session = get_session()
+    try:
+        # Log the payload being sent
+        payload = {
+            "model": "gpt-3.5-turbo",
+            "messages": messages,
+            "max_tokens": 1000,
+            "temperature": 0.0
+        }
+        # The payload carries the whole document text; only pretty-print it when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(f'Payload being sent to OpenAI API: {json.dumps(payload, indent=2)}')
 
-            async with session.post(url, headers=headers, json=payload, ssl=ssl_context) as response:
-                response_status = response.status
-                response_text = await response.text()
+        async with session.post(url, headers=headers, json=payload) as response:
+            response_status = response.status
+            response_text = await response.text()
 
-                logger.debug(f'OpenAI API response status: {response_status}')
-                logger.debug(f'OpenAI API response text: {response_text}')
+            logger.debug(f'OpenAI API response status: {response_status}')
+            logger.debug('OpenAI API response text: %s', response_text)
 
-                if response_status != 200:
-                    logger.error(f"OpenAI API request failed with status {response_status}: {response_text}")
-                    return {
-                        'success': False,
-                        'status': response_status,
-                        'message': 'Chat completion failed',
-                        'error': response_text
-                    }
-
-                response_data = await response.json()
+            if response_status != 200:
+                logger.error(f"OpenAI API request failed with status {response_status}: {response_text}")
                 return {
-                    'success': True,
-                    'status': 200,
-                    'response': response_data
+                    'success': False,
+                    'status': response_status,
+                    'message': 'Chat completion failed',
+                    'error': response_text
                 }
 
-        except Exception as e:
-            logger.error(f'Exception during OpenAI API request: {str(e)}')
+            response_data = await response.json()
             return {
-                'success': False,
-                'status': 500,
-                'message': 'An exception occurred during the API request',
-                'error': str(e)
+                'success': True,
+                'status': 200,
+                'response': response_data
             }
 
+    except Exception as e:
+        logger.error(f'Exception during OpenAI API request: {str(e)}')
+        return {
+            'success': False,
+            'status': 500,
+            'message': 'An exception occurred during the API request',
+            'error': str(e)
+        }
+
 def prepare_prompt(text: str, prompt: str) -> str:
     """
     Prepare the final prompt to be sent to the OpenAI API.
@@ -89,11 +116,12 @@ async def extract_with_openai(text: str, prompt: str) -> dict:
     """
     Main function to get the response from OpenAI API.
     """
-    if not text:
+    # Whitespace or punctuation alone has nothing to extract; reject it before paying for an API round-trip
+    if not text or not any(char.isalnum() for char in text):
         raise ValueError('Data is required')
 
     final_prompt = prepare_prompt(text, prompt)
-    logger.debug(f'Final prompt is: {final_prompt}')
+    logger.debug('Final prompt is: %s', final_prompt)
 
     messages = prepare_messages(default_system_prompt(), final_prompt)
 
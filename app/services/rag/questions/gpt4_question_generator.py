@@ -1,10 +1,35 @@
 # /app/services/gpt4_question_generator.py
 
+import re
 import asyncio
 from typing import List
 from app.config import settings, logger
 from app.services.llm_clients.openai import send_openai_request, prepare_messages
 
+# Heading that opens the answer for each keyword list in a batched response
+SECTION_HEADING = re.compile(r'^#+\s*Set\s+(\d+)\s*$', re.MULTILINE)
+
+def join_keywords(keywords: List[str], budget: int) -> str:
+    """
+    Join keywords in order until the character budget is exhausted, so a keyword-heavy document
+    cannot push the prompt past the model's context.
+
+    Args:
+        keywords (List[str]): The keywords, most important first.
+        budget (int): The maximum length of the joined string.
+
+    Returns:
+        str: The comma-separated keywords that fit within the budget.
+    """
+    kept, used = [], 0
+    for keyword in keywords:
+        used += len(keyword) + (2 if kept else 0)
+        if used > budget:
+            logger.debug('Keyword budget of %d characters reached; dropped %d of %d keywords', budget, len(keywords) - len(kept), len(keywords))
+            break
+        kept.append(keyword)
+    return ', '.join(kept)
+
 class GPT4QuestionGenerator:
     def __init__(self, api_key: str):
         self.api_key = api_key
@@ -21,7 +46,7 @@ class GPT4QuestionGenerator:
         """
         try:
             # Prepare the prompt
-            prompt = f"Given the following keywords: {', '.join(keywords)}, generate relevant questions."
+            prompt = f"Given the following keywords: {join_keywords(keywords, settings.QUESTION_KEYWORD_CHAR_BUDGET)}, generate relevant questions."
 
             # Prepare the messages
             messages = prepare_messages(system_prompt="You are a helpful assistant.", user_prompt=prompt)
@@ -40,6 +65,48 @@ class GPT4QuestionGenerator:
             logger.error(f"Error generating questions with GPT-4: {e}")
             raise
 
+    async def generate_questions_batched(self, keyword_lists: List[List[str]]) -> List[List[str]]:
+        """
+        Generate questions for several keyword lists (e.g. one per document) with a single API request.
+        The keyword lists are sent as numbered sets and the model answers each under a matching heading,
+        so the system prompt and the round-trip are paid once for the whole batch.
+
+        Args:
+            keyword_lists (List[List[str]]): The keyword lists to generate questions for.
+
+        Returns:
+            List[List[str]]: The generated questions for each keyword list, in order; empty for sets the
+            response did not answer.
+        """
+        try:
+            if not keyword_lists:
+                return []
+
+            # Share the budget across the sets so the whole batched prompt stays bounded
+            budget = settings.QUESTION_KEYWORD_CHAR_BUDGET // len(keyword_lists)
+            sets = "\n".join(f"Set {index}: {join_keywords(keywords, budget)}" for index, keywords in enumerate(keyword_lists, 1))
+            prompt = (
+                "For each of the following keyword sets, generate relevant questions.\n"
+                "Answer each set under its own heading of the form '### Set <number>'.\n\n"
+                f"{sets}"
+            )
+
+            messages = prepare_messages(system_prompt="You are a helpful assistant.", user_prompt=prompt)
+            result = await send_openai_request(messages)
+
+            if not result['success']:
+                logger.error(f"OpenAI API request failed: {result['error']}")
+                return [[] for _ in keyword_lists]
+
+            content = result['response']['choices'][0]['message']['content']
+            # re.split with a capturing group yields [preamble, number, body, number, body, ...]
+            parts = SECTION_HEADING.split(content)
+            answers = {int(number): body.strip() for number, body in zip(parts[1::2], parts[2::2])}
+            return [[answers[index]] if answers.get(index) else [] for index in range(1, len(keyword_lists) + 1)]
+        except Exception as e:
+            logger.error(f"Error generating batched questions with GPT-4: {e}")
+            raise
+
 if __name__ == "__main__":
     async def test_gpt4_question_generator():
         question_generator = GPT4QuestionGenerator(api_key=settings.OPENAI_API_KEY)
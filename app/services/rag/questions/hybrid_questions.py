@@ -3,6 +3,8 @@
 This module defines the integrated question generation service for the FastAPI application.
 """
 
+import asyncio
+from itertools import chain
 from typing import List, Optional
 from app.services.entity_recognition import EntityRecognizer
 from app.services.tfidf_extraction import TFIDFExtractor
@@ -40,39 +42,40 @@ class IntegratedQuestionGeneration:
             List[str]: A list of generated questions.
         """
         try:
-            # Step 1: Extract Entities (Await the asynchronous call)
-            entities = await self.entity_recognizer.recognize_entities(document_text)
+            # Steps 1-3: Extract Entities, Topics and TF-IDF Keywords. They are independent reads of the same text,
+            # so they run concurrently (topic modeling is synchronous, so it runs on a worker thread)
+            entities, topics, tfidf_keywords = await asyncio.gather(
+                self.entity_recognizer.recognize_entities(document_text),
+                asyncio.to_thread(self.topic_modeling_pipeline.run, [document_text]),
+                self.tfidf_extractor.extract_keywords(document_text)
+            )
             if not entities:
                 raise ValueError("No entities found in the document.")
-            await insert_entities(document_id, entities)
-
-            # Step 2: Extract Topics
-            topics = self.topic_modeling_pipeline.run([document_text])
             if not topics:
                 raise ValueError("No topics found in the document.")
-            await insert_topics(document_id, topics)
-
-            # Step 3: Extract TF-IDF Keywords
-            tfidf_keywords = await self.tfidf_extractor.extract_keywords(document_text)
             if not tfidf_keywords:
                 raise ValueError("No TF-IDF keywords found in the document.")
-            await insert_tf_idf_keywords(document_id, tfidf_keywords)
 
-            # Step 4: Combine Entities, Topics, and TF-IDF Keywords
-            combined_keywords = list(set([entity.word for entity in entities] +
-                                        [word for topic in topics for word in topic.words] +
-                                        tfidf_keywords))
+            await asyncio.gather(
+                insert_entities(document_id, entities),
+                insert_topics(document_id, topics),
+                insert_tf_idf_keywords(document_id, tfidf_keywords)
+            )
+
+            # Step 4: Combine Entities, Topics, and TF-IDF Keywords, deduplicated in a single pass in first-seen order
+            combined_keywords = list(dict.fromkeys(chain(
+                (entity.word for entity in entities),
+                (word for topic in topics for word in topic.words),
+                tfidf_keywords
+            )))
 
             # Step 5: Generate Questions using GPT-4 (Await the asynchronous call)
             questions = await self.question_generator.generate_questions(combined_keywords)
             if not questions:
                 raise ValueError("No questions generated.")
 
-            # Step 6: Evaluate Questions to assign confidence scores
-            questions_with_scores = []
-            for question in questions:
-                added_confidence_score = await self.question_evaluator.combined_evaluation(question)
-                questions_with_scores.append(added_confidence_score)
+            # Step 6: Evaluate Questions to assign confidence scores, every set in one batched forward pass
+            questions_with_scores = await self.question_evaluator.evaluate_question_sets(questions)
 
             # Insert the questions into the database
             await insert_questions(document_id, questions_with_scores, combined_keywords)
@@ -91,7 +94,6 @@ class IntegratedQuestionGeneration:
         self.question_evaluator.unload()
     
 if __name__ == "__main__":
-    import asyncio
     async def test_integrated_question_generation():
         integrated_service = IntegratedQuestionGeneration()
         document_text = "This is a sample document text about Apple Inc. and its various products and services."
@@ -1,6 +1,7 @@
 # /app/services/rag/integrated_question_generation.py
 
 from typing import List
+from itertools import chain
 from app.services.tfidf_extraction import TFIDFExtractor
 from app.services.entity_recognition import EntityRecognizer
 from app.services.topic_modeling.pipeline import TopicModelingPipeline
@@ -41,7 +42,7 @@ class IntegratedQuestionGeneration:
         # combined_keywords = list(set([entity.word for entity in entities] +
         #                               [word for topic in topics for word in topic.words] +
         #                               tfidf_keywords))
-        combined_keywords = list(set(entity_words + topic_words + tfidf_keywords))
+        combined_keywords = list(dict.fromkeys(chain(entity_words, topic_words, tfidf_keywords)))
         print(f"Combined Keywords: {combined_keywords}")
 
         # Step 5: Generate Questions using GPT-4 (Await the asynchronous call)
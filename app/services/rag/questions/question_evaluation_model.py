@@ -1,9 +1,14 @@
 import re
 import gc
 import torch
+import asyncio
+from itertools import chain
 from typing import List, Dict
-from transformers import BertTokenizer, BertForSequenceClassification
+from transformers import BertTokenizerFast, BertForSequenceClassification
 from app.config import logger
+from app.utils.torch_utils import configure_torch_threads
+
+configure_torch_threads()
 
 class QuestionEvaluator:
     def __init__(self, model_name: str = "bert-base-uncased"):
@@ -11,7 +16,7 @@ class QuestionEvaluator:
         Initializes the QuestionEvaluator with a pre-trained BERT model for sentence classification.
         """
         try:
-            self.tokenizer = BertTokenizer.from_pretrained(model_name)
+            self.tokenizer = BertTokenizerFast.from_pretrained(model_name)
             self.model = BertForSequenceClassification.from_pretrained(model_name)
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
             self.model.to(self.device)
@@ -20,42 +25,64 @@ class QuestionEvaluator:
             logger.error(f"Error initializing QuestionEvaluator with model {model_name}: {e}")
             raise ValueError(f"Failed to load model or tokenizer with name {model_name}") from e
 
-    async def evaluate_question(self, question: str) -> float:
+    def score_questions(self, questions: List[str]) -> List[float]:
         """
-        Evaluate the question to determine its confidence score.
+        Score several questions in one padded forward pass of the model.
 
         Args:
-            question (str): The question to evaluate.
+            questions (List[str]): The questions to score.
 
         Returns:
-            float: Confidence score between 0 and 1.
+            List[float]: The confidence score between 0 and 1 of each question, in order.
         """
-        try:
-            inputs = self.tokenizer(question, return_tensors="pt").to(self.device)
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-            
-            # Convert the logits to probabilities
-            probabilities = torch.softmax(outputs.logits, dim=1).cpu().numpy()
+        inputs = self.tokenizer(questions, padding=True, truncation=True, return_tensors="pt").to(self.device)
+        with torch.no_grad():
+            outputs = self.model(**inputs)
 
-            # Assuming the first label is 'bad' and the second is 'good'
-            confidence_score = probabilities[0][1]  # Index [0][1] refers to the confidence for the 'good' class
+        # Convert the logits to probabilities
+        probabilities = torch.softmax(outputs.logits, dim=1).cpu().numpy()
 
-            return float(confidence_score)
+        # Assuming the first label is 'bad' and the second is 'good'
+        return [float(score) for score in probabilities[:, 1]]  # Column 1 is the confidence for the 'good' class
 
+    async def evaluate_batch(self, questions: List[str]) -> List[float]:
+        """
+        Evaluate several questions at once, off the event loop.
+
+        Args:
+            questions (List[str]): The questions to evaluate.
+
+        Returns:
+            List[float]: Confidence scores between 0 and 1, in the order of the questions.
+        """
+        try:
+            return await asyncio.to_thread(self.score_questions, questions)
         except Exception as e:
             logger.error(f"Error evaluating question: {e}")
             raise ValueError("Failed to evaluate question confidence score") from e
 
-    async def evaluate_questions(self, questions_str: str) -> List[Dict[str, str]]:
+    async def evaluate_question(self, question: str) -> float:
         """
-        Splits the questions and assigns a question number and confidence score.
+        Evaluate the question to determine its confidence score.
+
+        Args:
+            question (str): The question to evaluate.
+
+        Returns:
+            float: Confidence score between 0 and 1.
+        """
+        scores = await self.evaluate_batch([question])
+        return scores[0]
+
+    def split_questions(self, questions_str: str) -> List[str]:
+        """
+        Splits a numbered block of questions into the individual questions.
 
         Args:
             questions_str (str): The string containing all the questions.
 
         Returns:
-            List[Dict[str, str]]: A list of dictionaries with question numbers, questions, and scores.
+            List[str]: The questions, in order.
         """
         # Step 1: Split the string into individual questions
         split_pattern = r'\n\d+\.\s'  # Regex to split at "\n" followed by a number and a dot (e.g., "\n1. ")
@@ -64,21 +91,65 @@ class QuestionEvaluator:
         # Step 2: Handle edge case where the first question starts without a preceding number
         if not questions[0].startswith("1."):
             questions = ["1. " + questions[0]] + questions[1:]
-        
-        # Step 3: Create a list of dictionaries with question number, question text, and confidence score
-        categorized_questions = []
-        for index, question in enumerate(questions, start=1):
-            # Evaluate the confidence score for each question
-            score = await self.evaluate_question(question.strip())
-            
-            categorized_questions.append({
+        return [question.strip() for question in questions]
+
+    async def evaluate_questions(self, questions_str: str) -> List[Dict[str, str]]:
+        """
+        Splits the questions and assigns a question number and confidence score.
+
+        Args:
+            questions_str (str): The string containing all the questions.
+
+        Returns:
+            List[Dict[str, str]]: A list of dictionaries with question numbers, questions, and scores.
+        """
+        questions = self.split_questions(questions_str)
+        # Evaluate the confidence scores of all the questions in one batch
+        scores = await self.evaluate_batch(questions)
+        return self._categorize(questions, scores)
+
+    def _categorize(self, questions: List[str], scores: List[float]) -> List[Dict[str, str]]:
+        """
+        Step 3: Create a list of dictionaries with question number, question text, and confidence score.
+        """
+        return [
+            {
                 "question_no": index,
-                "question": question.strip(),
-                "score": float(score)
+                "question": question,
+                "score": score
+            }
+            for index, (question, score) in enumerate(zip(questions, scores), start=1)
+        ]
+
+    async def evaluate_question_sets(self, questions_strs: List[str]) -> List[Dict[str, float]]:
+        """
+        Evaluate several sets of questions with a single batched forward pass.
+        The combined string of every set and every individual question are scored together, then split back per set,
+        instead of running a separate forward pass per set that competes for torch's threads.
+
+        Args:
+            questions_strs (List[str]): The strings containing the questions of each set.
+
+        Returns:
+            List[Dict[str, float]]: The categorized questions, average score and combined score of each set, in order.
+        """
+        question_sets = [self.split_questions(questions_str) for questions_str in questions_strs]
+        # The combined strings come first, followed by the questions of each set in order
+        scores = await self.evaluate_batch(list(chain(questions_strs, chain.from_iterable(question_sets))))
+
+        results = []
+        offset = len(questions_strs)
+        for combined_score, questions in zip(scores, question_sets):
+            categorized_questions = self._categorize(questions, scores[offset:offset + len(questions)])
+            offset += len(questions)
+            results.append({
+                "questions": categorized_questions,
+                "average_score": sum([question["score"] for question in categorized_questions]) / len(categorized_questions),
+                "combined_score": combined_score
             })
+        logger.info(f"Questions with scores: {results}")
+        return results
 
-        return categorized_questions
-    
     async def combined_evaluation(self, questions_str: str) -> Dict[str, float]:
         """
         Evaluate the combined confidence score for a set of questions.
@@ -89,18 +160,8 @@ class QuestionEvaluator:
         Returns:
             Dict[str, float]: The combined confidence score and the average score for the set of questions.
         """
-        combined_score = await self.evaluate_question(questions_str)
-        logger.info(f"Combined confidence score for questions: {combined_score}")
-        categorized_questions = await self.evaluate_questions(questions_str)
-        logger.info(f"Categorized questions: {categorized_questions}")
-
-        questions = {
-            "questions": categorized_questions,
-            "average_score": sum([question["score"] for question in categorized_questions]) / len(categorized_questions),
-            "combined_score": combined_score
-        }
-        logger.info(f"Questions with scores: {questions}")
-        return questions
+        results = await self.evaluate_question_sets([questions_str])
+        return results[0]
     
     def unload(self):
         """
@@ -120,8 +181,6 @@ class QuestionEvaluator:
     
 # Example Usage
 if __name__ == "__main__":
-    import asyncio
-
     async def main():
         questions_str = (
             "1. What is the significance of the name \"Willowbrook\" in the story?\n"
@@ -1,5 +1,6 @@
 # /app/services/tfidf_extraction.py
 
+from sklearn.base import clone
 from sklearn.feature_extraction.text import TfidfVectorizer
 from typing import List
 import asyncio
@@ -7,6 +8,24 @@ import asyncio
 class TFIDFExtractor:
     def __init__(self, max_features: int = 10):
         self.vectorizer = TfidfVectorizer(min_df=0.0, max_features=max_features, stop_words='english')
+
+    def top_keywords(self, text: str) -> List[str]:
+        """
+        Fits a fresh copy of the vectorizer on the text and ranks its terms.
+
+        Args:
+            text (str): The input text.
+
+        Returns:
+            List[str]: A list of top keywords based on TF-IDF.
+        """
+        vectorizer = clone(self.vectorizer)
+        tfidf_matrix = vectorizer.fit_transform([text])
+        feature_array = vectorizer.get_feature_names_out()
+        tfidf_sorting = tfidf_matrix.toarray().flatten().argsort()[::-1]
+
+        top_n = tfidf_sorting[:vectorizer.max_features]
+        return [feature_array[i] for i in top_n]
     
     async def extract_keywords(self, text: str) -> List[str]:
         """
@@ -18,10 +37,4 @@ class TFIDFExtractor:
         Returns:
             List[str]: A list of top keywords based on TF-IDF.
         """
-        loop = asyncio.get_event_loop()
-        tfidf_matrix = await loop.run_in_executor(None, self.vectorizer.fit_transform, [text])
-        feature_array = self.vectorizer.get_feature_names_out()
-        tfidf_sorting = await loop.run_in_executor(None, lambda: tfidf_matrix.toarray().flatten().argsort()[::-1])
-        
-        top_n = tfidf_sorting[:self.vectorizer.max_features]
-        return [feature_array[i] for i in top_n]
+        return await asyncio.to_thread(self.top_keywords, text)
@@ -1,10 +1,18 @@
 # app/services/topic_modeling/preprocessing.py
 
 import spacy
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def load_spacy_model(model_name: str) -> spacy.Language:
+    """
+    Load a spaCy model once per process and share it between TextPreprocessor instances.
+    """
+    return spacy.load(model_name)
 
 class TextPreprocessor:
     def __init__(self, model_name: str = "en_core_web_sm"):
-        self.nlp = spacy.load(model_name)
+        self.nlp = load_spacy_model(model_name)
     
     def preprocess_text(self, text: str) -> str:
         """
@@ -3,10 +3,97 @@
 This module defines a Celery task for running asynchronous tasks in a synchronous context.
 """
 
+import os
 import asyncio
+import threading
 from celery import shared_task
+from celery.signals import worker_process_init, worker_process_shutdown
 from app.config import logger
 
+# Event loop reused by every task run in this worker process, running forever on a daemon thread
+_worker_loop = None
+_worker_loop_pid = None
+_worker_loop_thread = None
+_worker_loop_lock = threading.Lock()
+_worker_loop_cleanups = []
+
+@worker_process_init.connect
+def init_worker_loop(**kwargs):
+    """
+    Give each forked worker process its own event loop; a loop inherited from the parent is never reused.
+    """
+    get_worker_loop()
+
+@worker_process_shutdown.connect
+def close_worker_loop(**kwargs):
+    """
+    Run the registered cleanups, then stop the worker's event loop thread and close the loop.
+    """
+    global _worker_loop, _worker_loop_thread
+    if _worker_loop is not None and not _worker_loop.is_closed() and _worker_loop_pid == os.getpid():
+        for cleanup in _worker_loop_cleanups:
+            try:
+                run_in_worker_loop(cleanup())
+            except Exception as e:
+                logger.error(f"Worker loop cleanup {cleanup.__name__} failed: {e}")
+        run_in_worker_loop(_worker_loop.shutdown_asyncgens())
+        _worker_loop.call_soon_threadsafe(_worker_loop.stop)
+        _worker_loop_thread.join()
+        _worker_loop.close()
+    _worker_loop_cleanups.clear()
+    _worker_loop = None
+    _worker_loop_thread = None
+
+def get_worker_loop():
+    """
+    Return the event loop of this worker process, starting it on its daemon thread on first use (or after a fork).
+    """
+    global _worker_loop, _worker_loop_pid, _worker_loop_thread
+    with _worker_loop_lock:
+        if _worker_loop is None or _worker_loop.is_closed() or _worker_loop_pid != os.getpid():
+            _worker_loop = asyncio.new_event_loop()
+            _worker_loop_pid = os.getpid()
+            _worker_loop_thread = threading.Thread(target=_worker_loop.run_forever, name="worker-loop", daemon=True)
+            _worker_loop_thread.start()
+        return _worker_loop
+
+def is_worker_loop(loop):
+    """
+    Check whether the loop is this worker process's long-lived event loop.
+    """
+    return loop is _worker_loop and _worker_loop_pid == os.getpid()
+
+def add_worker_loop_cleanup(cleanup):
+    """
+    Register a coroutine function to run on the worker loop before it is closed.
+
+    Args:
+    cleanup (callable): A coroutine function taking no arguments.
+    """
+    _worker_loop_cleanups.append(cleanup)
+
+def run_in_worker_loop(coro):
+    """
+    Run a coroutine on the worker loop and block the calling thread until it finishes.
+    If the caller is interrupted (e.g. by a Celery soft time limit), the coroutine is cancelled.
+
+    Args:
+    coro (coroutine): The coroutine to run.
+
+    Returns:
+    result: The result of the coroutine.
+    """
+    loop = get_worker_loop()
+    if threading.current_thread() is _worker_loop_thread:
+        coro.close()
+        raise RuntimeError("Cannot block on the worker loop from its own thread")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
 @shared_task
 def run_async_task(async_func, *args, **kwargs):
     """
@@ -20,17 +107,11 @@ def run_async_task(async_func, *args, **kwargs):
     Returns:
     result: The result of the asynchronous function.
     """
-    loop = asyncio.get_event_loop()
-    if loop.is_running():
-        # If there's an existing running loop, use it to run the async function
-        future = asyncio.run_coroutine_threadsafe(async_func(*args, **kwargs), loop)
-        return future.result()
-    else:
-        try:
-            # If no running loop, create and run a new loop
-            result = loop.run_until_complete(async_func(*args, **kwargs))
-            logger.info(f"Successfully executed async task: {async_func.__name__} with result: {result}")
-            return result
-        except Exception as e:
-            logger.error(f"Error executing async task {async_func.__name__}: {e}")
-            raise
+    try:
+        # Every thread hands its coroutine to the process-wide loop instead of building and tearing one down per task
+        result = run_in_worker_loop(async_func(*args, **kwargs))
+        logger.info(f"Successfully executed async task: {async_func.__name__} with result: {result}")
+        return result
+    except Exception as e:
+        logger.error(f"Error executing async task {async_func.__name__}: {e}")
+        raise
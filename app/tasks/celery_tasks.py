@@ -6,8 +6,23 @@ This module defines utility functions for celery to be used in the FastAPI appli
 import asyncio
 from celery import shared_task
 from celery.result import AsyncResult
+from celery.exceptions import TimeoutError as CeleryTimeoutError
 from app.config import logger
 
+def _get_task_result(task_id: str, timeout: int):
+    """
+    Block on the result backend until the task finishes.
+    The AsyncResult is built here so it binds the result backend of the calling thread: Celery keeps one
+    backend (and one Redis pubsub consumer) per thread, and it must not be shared between threads.
+
+    Returns:
+    tuple: The result of the task and whether the task failed.
+    """
+    task = AsyncResult(task_id)
+    # disable_sync_subtasks is off because this is awaited from inside the process_pdf task.
+    result = task.get(timeout=timeout, propagate=False, disable_sync_subtasks=False)
+    return result, task.failed()
+
 @shared_task
 async def wait_for_celery_task(task_id: str, timeout: int):
     """
@@ -23,25 +38,18 @@ async def wait_for_celery_task(task_id: str, timeout: int):
     Raises:
     TimeoutError: If the task does not complete within the timeout.
     """
-    task = AsyncResult(task_id)
-    start_time = asyncio.get_event_loop().time()
-    
     try:
-        while not task.ready():
-            elapsed_time = asyncio.get_event_loop().time() - start_time
-            if elapsed_time > timeout:
-                raise TimeoutError(f"Celery task {task_id} timed out after {timeout} seconds")
-            await asyncio.sleep(1)
-        
-        result = task.result
-        if task.failed():
-            raise task.result
+        # Block on the result backend in a worker thread instead of polling, so completion is seen immediately.
+        result, failed = await asyncio.to_thread(_get_task_result, task_id, timeout)
+        if failed:
+            raise result
         logger.info(f"Task {task_id} completed successfully with result: {result}")
         return result
-    
-    except TimeoutError as te:
+
+    except CeleryTimeoutError:
+        te = TimeoutError(f"Celery task {task_id} timed out after {timeout} seconds")
         logger.error(te)
-        raise
+        raise te
 
     except Exception as e:
         logger.error(f"Error occurred while waiting for Celery task {task_id}: {e}")
@@ -55,12 +63,3 @@ if __name__ == "__main__":
         asyncio.run(wait_for_celery_task(task_id, timeout))
     except Exception as e:
         logger.error(f"Failed to complete task {task_id}: {e}")
-
-if __name__ == "__main__":
-    # Example usage of the wait_for_celery_task function
-    task_id = "task_id"
-    timeout = 60
-    try:
-        asyncio.run(wait_for_celery_task(task_id, timeout))
-    except Exception as e:
-        logger.error(f"Failed to complete task {task_id}: {e}")
\ No newline at end of file
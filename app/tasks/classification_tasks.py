@@ -8,7 +8,7 @@ import torch
 import asyncio
 from typing import List, Dict, Any
 from concurrent.futures import ThreadPoolExecutor
-from transformers import BertTokenizer, BertForSequenceClassification, pipeline
+from transformers import BertTokenizerFast, BertForSequenceClassification, pipeline
 from app.models.rag_model import Classification
 from app.config import logger
 
@@ -17,7 +17,7 @@ class DocumentClassifier:
     A service class for classifying documents using a BERT-based model.
 
     Attributes:
-        tokenizer (BertTokenizer): Tokenizer for text processing.
+        tokenizer (BertTokenizerFast): Tokenizer for text processing.
         model (BertForSequenceClassification): Model for sequence classification.
         device (str): Device to run the model on, either 'cuda' or 'cpu'.
     """
@@ -30,7 +30,7 @@ class DocumentClassifier:
             Exception: If there's an error during initialization.
         """
         try:
-            self.tokenizer = BertTokenizer.from_pretrained("bert-base-uncased")
+            self.tokenizer = BertTokenizerFast.from_pretrained("bert-base-uncased")
             self.model = BertForSequenceClassification.from_pretrained("bert-base-uncased")
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
             self.model.to(self.device)
@@ -3,27 +3,45 @@
 This module defines the PDF processing tasks for the FastAPI application.
 """
 
+import os
+import fitz
 import asyncio
 import importlib
+from functools import lru_cache
 from celery import shared_task, Task
 from app.config import settings, logger
 from app.models.pdf_model import PDFTextResponse
 from app.tasks.async_tasks import run_async_task
 from app.tasks.celery_tasks import wait_for_celery_task
+from app.utils.cache_utils import file_digest, cache_get, cache_set
 from app.services.document_processors.pdf.muPDF import usePyMuPDF
-from app.services.document_processors.pdf.pdf_miner import usePDFMiner
+from app.services.document_processors.pdf.pdf_miner import usePDFMiner, extract_pdfminer
 from app.services.document_processors.pdf.textract import useTextract
 from app.services.document_processors.pdf.tesseract import useTesseract
 from app.config import settings
 
+# Processors that can run in the current worker instead of going through the broker
+IN_PROCESS_EXTRACTORS = {
+    usePDFMiner: extract_pdfminer,
+}
+
 # class PDFTask(Task):
 #     autoretry_for = (Exception,)
 #     retry_kwargs = {'max_retries': 3, 'countdown': 5}
 #     retry_backoff = True
 
 # @shared_task(Base=PDFTask)
-@shared_task()
-def process_pdf(temp_path):
+@shared_task(
+    bind=True,
+    acks_late=False,                                            # Ack on receipt so a crashed worker does not redeliver a long PDF job.
+    soft_time_limit=settings.PDF_PROCESSING_TIMEOUT,            # Raise SoftTimeLimitExceeded inside the task first...
+    time_limit=settings.PDF_PROCESSING_TIMEOUT + 30,            # ...and kill it if it still has not returned.
+    autoretry_for=(OSError,),                                   # Retry transient I/O failures only...
+    dont_autoretry_for=(FileNotFoundError, PermissionError),    # ...a missing or unreadable file never recovers.
+    retry_backoff=True,
+    retry_kwargs={'max_retries': 3}
+)
+def process_pdf(self, temp_path):
     """
     Process PDF files based on type and handle fallbacks.
 
@@ -34,15 +52,56 @@ def process_pdf(temp_path):
     PDFTextResponse: Contains the file name, concatenated text, and bounding boxes.
     """
     try:
-        results = run_async_task(_process_pdf, temp_path)
+        # Celery's task context is thread-local, so check it here before the work moves to the worker loop thread
+        in_worker = not self.request.called_directly
+        results = run_async_task(_process_pdf, temp_path, in_worker)
         if not results['bounding_boxes']:
             logger.warning(f"No text extracted from {temp_path}")
             raise Exception(f"PDF processing failed...")
         return results
+    except OSError:
+        # Let autoretry_for pick the transient ones up; missing or unreadable files fail the task outright
+        raise
     except Exception as e:
         logger.error(f"Failed to process PDF {temp_path} with error: {e}")
         return PDFTextResponse(file_name=temp_path, text="", bounding_boxes=[]).to_dict()
 
+def is_pdf_scanned(file_path, min_text_length=50):
+    """
+    Check whether a PDF is scanned by sampling its first, middle and last pages.
+    The PDF only counts as scanned when every sampled page is image-only, so an image cover page in front of a
+    text layer does not send the whole document to OCR. The check stops at the first page that rules it out.
+
+    Args:
+    file_path (str): The path to the PDF file.
+    min_text_length (int): The number of characters that marks a page as having a text layer.
+
+    Returns:
+    bool: True if every sampled page has images but no text layer, False otherwise.
+    """
+    # Key the verdict on the file's mtime and size so retries on the same file skip reopening it
+    stat = os.stat(file_path)
+    return _is_pdf_scanned(file_path, stat.st_mtime_ns, stat.st_size, min_text_length)
+
+@lru_cache(maxsize=256)
+def _is_pdf_scanned(file_path, mtime_ns, size, min_text_length):
+    """
+    Sample the first, middle and last pages of the PDF; cached per (path, mtime, size).
+    """
+    doc = fitz.open(file_path)
+    try:
+        page_count = doc.page_count
+        for page_index in sorted({0, page_count // 2, page_count - 1} if page_count else ()):
+            page = doc.load_page(page_index)
+            if len(page.get_text().strip()) >= min_text_length:
+                return False
+            # full=False skips building the XObject details that are not needed for a yes/no answer
+            if not page.get_images(full=False):
+                return False
+        return page_count > 0
+    finally:
+        doc.close()
+
 async def process_with_fallbacks(file_path, processors):
     """
     Process the PDF file using a list of processors with fallback.
@@ -66,12 +125,78 @@ async def process_with_fallbacks(file_path, processors):
             
     return PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict()
 
-async def _process_pdf(temp_path):
+async def process_speculatively(file_path, processors, in_worker=False):
+    """
+    Run several processors at once and keep the response of the earliest processor in the list that has bounding boxes.
+    A later processor's response is only used once every processor ahead of it came back empty or failed, so the
+    coordinate space of the result does not depend on which one finishes first.
+    The processors that are still running at that point are cancelled and revoked.
+
+    Args:
+    file_path (str): The path to the PDF file.
+    processors (list): A list of processor tasks to run in parallel, in order of preference.
+    in_worker (bool): Whether this runs inside a Celery worker, where in-process extractors can be used.
+
+    Returns:
+    tuple: The preferred non-empty response (or an empty one) and whether the PDF may carry images.
+    """
+    celery_tasks = {}
+    for processor in processors:
+        logger.info(f"Starting processor {processor.__name__} for {file_path}")
+        extractor = IN_PROCESS_EXTRACTORS.get(processor)
+        if extractor is not None and in_worker:
+            # Already on a worker: run the extractor in a thread and skip the broker round-trips
+            task = None
+            waiter = asyncio.create_task(
+                asyncio.wait_for(asyncio.to_thread(extractor, file_path), settings.PDF_PROCESSING_TIMEOUT)
+            )
+        else:
+            task = processor.delay(file_path)
+            waiter = asyncio.create_task(wait_for_celery_task(task.id, settings.PDF_PROCESSING_TIMEOUT))
+        celery_tasks[waiter] = (processor, task)
+
+    image_flags = []
+    responses = {}
+    pending = set(celery_tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in done:
+                processor, _ = celery_tasks[waiter]
+                try:
+                    response = waiter.result()
+                except Exception as e:
+                    logger.error(f"Processor {processor.__name__} failed for {file_path} with error: {e}")
+                    response = None
+                if response is not None and 'has_images' in response:
+                    image_flags.append(response.pop('has_images'))
+                responses[waiter] = response
+
+            # Walk the processors in order of preference and stop at the first one still running
+            for waiter in celery_tasks:
+                if waiter not in responses:
+                    break
+                response = responses[waiter]
+                if response is not None and response['bounding_boxes']:
+                    return response, any(image_flags)
+    finally:
+        for waiter in pending:
+            waiter.cancel()
+            task = celery_tasks[waiter][1]
+            if task is not None:
+                task.revoke(terminate=True)
+
+    # Without a verdict from any processor, assume images so OCR still gets a chance
+    has_images = any(image_flags) if image_flags else True
+    return PDFTextResponse(file_name=file_path, text="", bounding_boxes=[]).to_dict(), has_images
+
+async def _process_pdf(temp_path, in_worker=False):
     """
     Process PDF files based on type and handle fallbacks.
 
     Args:
     temp_path (str): The temporary path of the PDF file.
+    in_worker (bool): Whether this runs inside a Celery worker.
 
     Returns:
     PDFTextResponse: Contains the file name, concatenated text, and bounding boxes.
@@ -79,13 +204,41 @@ async def _process_pdf(temp_path):
     try:
         logger.info(f"Starting process_pdf task for {temp_path}")
 
-        # Processors in the order of preference
-        processors = [usePyMuPDF, usePDFMiner, useTextract, useTesseract]
+        # Identical content gives identical results, so retries and re-uploads are served from the cache
+        digest = await asyncio.to_thread(file_digest, temp_path)
+        cached = await cache_get(f"pdf:extract:{digest}")
+        if cached is not None:
+            logger.info(f"Serving cached extraction for {temp_path}")
+            cached['file_name'] = temp_path
+            return cached
+
+        scanned = await cache_get(f"pdf:scanned:{digest}")
+        if scanned is None:
+            try:
+                scanned = await asyncio.to_thread(is_pdf_scanned, temp_path)
+                await cache_set(f"pdf:scanned:{digest}", scanned)
+            except Exception as e:
+                logger.error(f"Failed to check whether {temp_path} is scanned: {e}")
+                scanned = False
+
+        if scanned:
+            # No text layer to extract, go straight to OCR
+            logger.info(f"{temp_path} looks scanned, skipping the text-layer extractors")
+            response = await process_with_fallbacks(temp_path, [useTextract, useTesseract])
+        else:
+            # The text-layer extractors race each other; PyMuPDF also reports whether the PDF carries any images
+            response, has_images = await process_speculatively(temp_path, [usePyMuPDF, usePDFMiner], in_worker)
 
-        response = await process_with_fallbacks(temp_path, processors)
+            # OCR is only worth trying when no text layer was found and there are images to read
+            if not response['bounding_boxes'] and has_images:
+                response = await process_with_fallbacks(temp_path, [useTextract, useTesseract])
         logger.info(f"Processing result: {response}")
+        if response['bounding_boxes']:
+            await cache_set(f"pdf:extract:{digest}", response)
         return response
 
+    except OSError:
+        raise
     except Exception as e:
         logger.error(f"Failed to process PDF {temp_path} with error: {e}")
         return PDFTextResponse(file_name="", text="", bounding_boxes=[]).to_dict()
@@ -93,5 +246,5 @@ async def _process_pdf(temp_path):
 # Example usage:
 if __name__ == "__main__":
     temp_path = "/tmp/sample.pdf"
-    results = asyncio.run(process_pdf(temp_path))
+    results = process_pdf(temp_path)
     print(results)
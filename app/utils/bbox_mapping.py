@@ -65,25 +65,28 @@ async def map_bbox_to_data(llm_data: List[ExtractionItem], bbox_data: List[PDFTe
     """
     bounding_boxes = await get_bbox(bbox_data)
     response_items = []
-    
+
     try:
+        # Index the boxes by text once, keeping the first box for each text, instead of scanning every box per item
+        bbox_index = {}
+        for bbox in bounding_boxes:
+            bbox_index.setdefault(bbox["text"], bbox)
+
         for item in llm_data:
-            for bbox in bounding_boxes:
-                if item.matching_value == bbox["text"]:
-                    response_item = ResponseItem(
-                        key=item.key,
-                        matching_key=item.matching_key,
-                        matching_value=item.matching_value,
-                        value=item.value,
-                        additional_comments=item.additional_comments,
-                        page=bbox["page"],
-                        bounding_box=ResponseBoundingBox(**bbox["bbox"]),
-                        confidence=bbox["confidence"]
-                    )
-                    response_items.append(response_item)
-                    break  # Break after finding the first match to avoid redundant checks
-                else:
-                    response_item = ResponseItem(
+            bbox = bbox_index.get(item.matching_value)
+            if bbox is not None:
+                response_item = ResponseItem(
+                    key=item.key,
+                    matching_key=item.matching_key,
+                    matching_value=item.matching_value,
+                    value=item.value,
+                    additional_comments=item.additional_comments,
+                    page=bbox["page"],
+                    bounding_box=ResponseBoundingBox(**bbox["bbox"]),
+                    confidence=bbox["confidence"]
+                )
+            else:
+                response_item = ResponseItem(
                     key=item.key,
                     matching_key=item.matching_key,
                     matching_value=item.matching_value,
@@ -93,7 +96,7 @@ async def map_bbox_to_data(llm_data: List[ExtractionItem], bbox_data: List[PDFTe
                     bounding_box=ResponseBoundingBox(left=0, top=0, width=0, height=0),
                     confidence=0.0
                 )
-                response_items.append(response_item)
+            response_items.append(response_item)
     except Exception as e:
         print(f"Error mapping bounding boxes to LLM data: {str(e)}")
     
@@ -0,0 +1,90 @@
+# /app/utils/cache_utils.py
+"""
+This module defines the Redis-backed result cache for the FastAPI application.
+Values are keyed by the content digest of the processed file or text, so identical inputs and retries reuse earlier results.
+"""
+
+import os
+import mmap
+import weakref
+import asyncio
+import orjson
+from blake3 import blake3
+import redis.asyncio as aioredis
+from typing import Any, Optional
+from app.config import settings, logger
+
+# One client per event loop; a redis.asyncio connection pool cannot be shared across loops
+_clients = weakref.WeakKeyDictionary()
+
+def get_redis() -> aioredis.Redis:
+    """
+    Return the Redis client for the running event loop, creating it on first use.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = aioredis.from_url(settings.REDIS_URL)
+        _clients[loop] = client
+    return client
+
+def file_digest(file_path: str) -> str:
+    """
+    Compute the BLAKE3 content digest of a file.
+    The file is memory-mapped and hashed in place by blake3's multi-threaded SIMD implementation, which releases the GIL.
+
+    Args:
+    file_path (str): The path to the file.
+
+    Returns:
+    str: The hex digest of the file content.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be memory-mapped
+            return blake3().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return blake3(mm, max_threads=blake3.AUTO).hexdigest()
+
+def text_digest(text: str) -> str:
+    """
+    Compute the BLAKE3 digest of a text.
+
+    Args:
+    text (str): The text.
+
+    Returns:
+    str: The hex digest of the UTF-8 encoded text.
+    """
+    return blake3(text.encode()).hexdigest()
+
+async def cache_get(key: str) -> Optional[Any]:
+    """
+    Get a cached value.
+
+    Args:
+    key (str): The cache key.
+
+    Returns:
+    Any: The cached value, or None on a miss or if Redis is unavailable.
+    """
+    try:
+        value = await get_redis().get(key)
+        return orjson.loads(value) if value is not None else None
+    except Exception as e:
+        logger.warning(f"Cache lookup failed for {key}: {e}")
+        return None
+
+async def cache_set(key: str, value: Any, ttl: int = settings.PDF_CACHE_TTL) -> None:
+    """
+    Store a value in the cache; failures are logged and otherwise ignored.
+
+    Args:
+    key (str): The cache key.
+    value (Any): The JSON-serializable value to store.
+    ttl (int): The time to live in seconds.
+    """
+    try:
+        await get_redis().set(key, orjson.dumps(value), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Cache store failed for {key}: {e}")
@@ -10,13 +10,17 @@ from app.config import settings, logger, get_base_url
 
 database = settings.database
 
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
 async def save_temp_file(file: UploadFile) -> str:
     """
     Save the uploaded file to a temporary path asynchronously.
     """
     temp_path = f"/tmp/{file.filename}"
     async with aiofiles.open(temp_path, 'wb') as temp_file:
-        await temp_file.write(await file.read())
+        # Stream in chunks so the whole upload is never held in memory
+        while chunk := await file.read(CHUNK_SIZE):
+            await temp_file.write(chunk)
     return temp_path
 
 async def get_file_type(file: UploadFile) -> str:
@@ -1,8 +1,12 @@
 # app/utils/llm_utils.py
 """
 This module contains utility functions for the LLM service.
+The prompts are constant, so each is cleaned up once and cached.
 """
 
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
 def iac_user_prompt ():
     prompt =  """
         Here is the details of the task:
@@ -73,6 +77,7 @@ def iac_user_prompt ():
     prompt = "\n".join(line.strip() for line in prompt.split("\n"))
     return prompt
 
+@lru_cache(maxsize=None)
 def default_user_prompt():
     prompt = """
         Here is the details of the task:
@@ -140,6 +145,7 @@ def default_user_prompt():
     prompt = "\n".join(line.strip() for line in prompt.split("\n"))
     return prompt
 
+@lru_cache(maxsize=None)
 def iac_system_prompt():
     prompt = """
         You are an AI assistant tasked with extracting specific information from a 
@@ -154,6 +160,7 @@ def iac_system_prompt():
     prompt = "\n".join(line.strip() for line in prompt.split("\n"))
     return prompt
 
+@lru_cache(maxsize=None)
 def default_system_prompt():
     prompt = """
         You are an AI assistant tasked with extracting specific information from a document. 
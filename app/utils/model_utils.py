@@ -3,11 +3,31 @@
 This module contains utility functions to convert CSV data to JSON.
 """
 
+import re
 import csv
 from io import StringIO
 from app.models.llm_model import ExtractionItem, ExtractionResponse
 from app.config import logger
 
+# CSV column for each ExtractionItem field
+CSV_COLUMNS = {
+    "key": "Information Key",
+    "matching_key": "Matching Key",
+    "matching_value": "Matching Value",
+    "value": "Value",
+    "additional_comments": "Addl. Comments",
+}
+
+# A response wrapped in a Markdown code fence, e.g. ```csv ... ```
+CODE_FENCE = re.compile(r'^\s*```[\w-]*[ \t]*\n(.*?)\n?[ \t]*```\s*$', re.DOTALL)
+
+def strip_code_fence(content: str) -> str:
+    """
+    Return the body of a response wrapped in a Markdown code fence, or the response itself if it is not fenced.
+    """
+    match = CODE_FENCE.match(content)
+    return match.group(1) if match else content
+
 def csv_to_json(csv_content: str) -> ExtractionResponse:
     """
     Convert CSV content to an ExtractionResponse object.
@@ -22,21 +42,28 @@ def csv_to_json(csv_content: str) -> ExtractionResponse:
     data_items = []
 
     try:
+        # LLMs often fence the table; unwrap it so the fence line is not taken for the header
+        csv_content = strip_code_fence(csv_content)
+
         # Use StringIO to read the CSV content
-        csv_reader = csv.DictReader(StringIO(csv_content), delimiter='|')
-        logger.debug(f"CSV content: {csv_content}")
-        
+        csv_reader = csv.reader(StringIO(csv_content), delimiter='|')
+        logger.debug('CSV content: %s', csv_content)
+
+        # Look the column positions up once in the header instead of building a dict for every row
+        header = {name: index for index, name in enumerate(next(csv_reader, []))}
+        positions = {}
+        for field, column in CSV_COLUMNS.items():
+            if column not in header:
+                raise KeyError(column)
+            positions[field] = header[column]
+
         for row in csv_reader:
+            if not row:
+                continue
             # Create an ExtractionItem for each row in the CSV
-            item = ExtractionItem(
-                key=row["Information Key"].strip(),
-                matching_key=row["Matching Key"].strip(),
-                matching_value=row["Matching Value"].strip(),
-                value=row["Value"].strip(),
-                additional_comments=row["Addl. Comments"].strip()
-            )
+            item = ExtractionItem(**{field: row[index].strip() for field, index in positions.items()})
             data_items.append(item)
-        
+
     except KeyError as ke:
         logger.error(f"KeyError: {ke}")
         raise ValueError(f"Missing expected column in CSV: {ke}")
@@ -0,0 +1,19 @@
+# /app/utils/torch_utils.py
+"""
+This module contains utility functions for running torch models in the FastAPI workers.
+"""
+
+import os
+import torch
+from app.config import settings, logger
+
+def configure_torch_threads():
+    """
+    Size torch's intra-op thread pool to this worker's share of the CPUs.
+    Each gunicorn worker runs its own models, so giving every worker all the cores oversubscribes the machine,
+    while a single thread leaves inference serial. An explicit OMP_NUM_THREADS is left alone.
+    """
+    if os.environ.get("OMP_NUM_THREADS") is not None:
+        return
+    torch.set_num_threads(settings.TORCH_NUM_THREADS)
+    logger.info(f"Using {settings.TORCH_NUM_THREADS} torch threads per worker")
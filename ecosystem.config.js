@@ -12,7 +12,35 @@ module.exports = {
     {
       name: 'celery-worker',
       script: 'celery',
-      args: '-A app.tasks.celery_config worker --loglevel=info',
+      args: '-A app.tasks.celery_config worker -Q celery --loglevel=info',
+      interpreter: 'python3',
+      env: {
+        "AWS_ACCESS_KEY_ID": "your_aws_access_key_id",
+        "AWS_SECRET_ACCESS_KEY": "your_aws_secret_access_key",
+        "OPENAI_API_KEY": "your_openai_api_key",
+        "CLAUDE_API_KEY": "your_claude_api_key",
+        "BEARER_TOKEN": "your_bearer_token"
+      }
+    },
+    {
+      // Text-layer extraction (PyMuPDF, PDFMiner): short tasks, high concurrency
+      name: 'celery-worker-pdf-text',
+      script: 'celery',
+      args: '-A app.tasks.celery_config worker -Q pdf_text -c 8 -n pdf_text@%h --loglevel=info',
+      interpreter: 'python3',
+      env: {
+        "AWS_ACCESS_KEY_ID": "your_aws_access_key_id",
+        "AWS_SECRET_ACCESS_KEY": "your_aws_secret_access_key",
+        "OPENAI_API_KEY": "your_openai_api_key",
+        "CLAUDE_API_KEY": "your_claude_api_key",
+        "BEARER_TOKEN": "your_bearer_token"
+      }
+    },
+    {
+      // OCR (Textract, Tesseract): memory-heavy tasks, low concurrency
+      name: 'celery-worker-pdf-ocr',
+      script: 'celery',
+      args: '-A app.tasks.celery_config worker -Q pdf_ocr -c 2 -n pdf_ocr@%h --loglevel=info',
       interpreter: 'python3',
       env: {
         "AWS_ACCESS_KEY_ID": "your_aws_access_key_id",
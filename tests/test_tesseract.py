@@ -0,0 +1,32 @@
+# /tests/test_tesseract.py
+
+import cv2
+import numpy as np
+import pytest
+from app.services.document_processors.pdf.tesseract import estimate_skew
+
+def synthetic_page(height, width, angle, block=None):
+    """
+    Draw evenly spaced text lines as filled bars and rotate the page counter-clockwise by the given angle.
+    The bars fill the page inside its margins, or the (left, top, right, bottom) block when one is given.
+    """
+    left, top, right, bottom = block or (60, 80, width - 60, height - 80)
+    page = np.zeros((height, width), dtype=np.uint8)
+    for line_top in range(top, bottom, 30):
+        cv2.rectangle(page, (left, line_top), (right, line_top + 10), 255, -1)
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(page, matrix, (width, height))
+
+@pytest.mark.parametrize("height, width", [(1100, 850), (600, 1000)], ids=["portrait", "landscape"])
+@pytest.mark.parametrize("angle", [-7, -3, 0, 3, 7])
+def test_estimate_skew_levels_rotated_text(height, width, angle):
+    # Undoing a counter-clockwise rotation takes the same angle clockwise
+    assert estimate_skew(synthetic_page(height, width, angle)) == pytest.approx(-angle, abs=0.5)
+
+@pytest.mark.parametrize("angle", [-7, 3, 20])
+def test_estimate_skew_ignores_square_ink(angle):
+    # A square block of ink has no dominant axis, so its moments say nothing about the line direction
+    assert estimate_skew(synthetic_page(1000, 1000, angle, block=(200, 200, 800, 800))) == 0.0
+
+def test_estimate_skew_blank_page():
+    assert estimate_skew(np.zeros((100, 100), dtype=np.uint8)) == 0.0
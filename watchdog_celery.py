@@ -61,7 +61,7 @@ def start_celery_worker():
     try:
         logger.info("Starting Celery worker...")
         process = subprocess.Popen(
-            ["celery", "-A", "app.tasks.celery_config", "worker", "--loglevel=info", "--logfile=" + os.path.join(args.logpath, 'celery.log')],
+            ["celery", "-A", "app.tasks.celery_config", "worker", "-Q", "celery,pdf_text,pdf_ocr", "--loglevel=info", "--logfile=" + os.path.join(args.logpath, 'celery.log')],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )